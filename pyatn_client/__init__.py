@@ -1,12 +1,26 @@
-name = "pyatn-client"
-
-from .microraiden.client import Client, Channel
-from .atn import Atn, AtnException
+import sys
 
+name = "pyatn-client"
 
 __all__ = [
-    Client,
-    Channel,
-    Atn,
-    AtnException
+    'Client',
+    'Channel',
+    'Atn',
+    'AtnException'
 ]
+
+if sys.version_info >= (3, 7):
+    # web3 and the microraiden client are imported on first access (PEP 562),
+    # so `import pyatn_client` and the `pyatn` CLI stay cheap
+    def __getattr__(attr):
+        if attr in ('Client', 'Channel'):
+            from . import microraiden as module
+        elif attr in ('Atn', 'AtnException'):
+            from . import atn as module
+        else:
+            raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, attr))
+        value = globals()[attr] = getattr(module, attr)
+        return value
+else:
+    from .microraiden.client import Client, Channel
+    from .atn import Atn, AtnException
@@ -1,44 +1,87 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import os
 import logging
 import logging.config
 import time
-from typing import Callable, Tuple, Union
-import json
-from munch import Munch
+import random
+import asyncio
+import threading
+import functools
+import weakref
+import concurrent.futures
+from typing import Callable, Dict, Iterable, List, Tuple
+import pkgutil
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from web3 import Web3, HTTPProvider
+from web3 import Web3
 from web3.middleware import geth_poa_middleware
-from eth_utils import is_same_address, decode_hex, encode_hex
+from eth_utils import is_same_address, decode_hex
 
 from .microraiden.header import HTTPHeaders
 from .microraiden.client import Client, Channel
-from .microraiden.utils import verify_balance_proof
+from .microraiden.utils import verify_balance_proof, batch_call
 
-from .utils import remove_slash_prefix, tobytes32
+from .utils import remove_slash_prefix, tobytes32, _SessionHTTPProvider
 from .log import AtnLogger
 
+try:
+    import orjson as _json_lib
+except ImportError:
+    import json as _json_lib
+try:
+    from importlib.resources import files as _resource_files
+except ImportError:
+    # python < 3.9
+    _resource_files = None
+
 logger = logging.getLogger('atn')
 
+PRICE_CACHE_TTL = 60
+"""int: seconds to reuse an endpoint price read from the DBot contract"""
+
+HTTP_TIMEOUT = (3.0, 10.0)
+"""tuple: default (connect, read) timeout of channel sync and close requests to DBot servers, seconds"""
+
+CALL_HTTP_TIMEOUT = (3.0, 120.0)
+"""tuple: default (connect, read) timeout of the paid API calls, the payment is sent before the API runs, seconds"""
+
+SYNC_RETRY_BASE_INTERVAL = 0.1
+"""float: first retry interval of `wait_dbot_sync`, doubled on every retry, seconds"""
+
 class AtnException(Exception):
     """Base exception for ATN Client"""
     pass
 
-def _make_dbot_contract(web3, dbot_address):
-    contracts_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'contracts.json')
-    if os.path.exists(contracts_file):
-        with open(contracts_file) as fh:
-            contracts = json.load(fh)
+@functools.lru_cache(maxsize=1024)
+def _checksum(address: str) -> str:
+    return Web3.toChecksumAddress(address)
+
+def _normalize_url(domain: str) -> str:
+    if domain[:7].lower() == 'http://' or domain[:8].lower() == 'https://':
+        return domain
+    return 'http://' + domain
+
+def _load_contracts():
+    if _resource_files is not None:
+        data = _resource_files('pyatn_client').joinpath('contracts.json').read_bytes()
     else:
-        contracts = json.loads(pkg_resources.resource_string('pyatn_client', 'contracts.json'))
-    dbot_address = Web3.toChecksumAddress(dbot_address)
+        data = pkgutil.get_data('pyatn_client', 'contracts.json')
+    return _json_lib.loads(data)
+
+_CONTRACTS = _load_contracts()
+_DBOT_ABI = _CONTRACTS['Dbot']['abi']
+_DBOT_BYTECODE = _CONTRACTS['Dbot']['bytecode']
+
+@functools.lru_cache(maxsize=256)
+def _make_dbot_contract(web3, dbot_address):
+    """Dbot contract object, one per web3 instance and checksum address."""
     dbotContract = web3.eth.contract(address=dbot_address,
-                                     abi=contracts['Dbot']['abi'],
-                                     bytecode=contracts['Dbot']['bytecode'])
+                                     abi=_DBOT_ABI,
+                                     bytecode=_DBOT_BYTECODE)
     return dbotContract
 
 class Atn():
@@ -61,22 +104,59 @@ class Atn():
         pk_file: str,
         pw_file: str,
         http_provider: str = 'https://rpc-test.atnio.net',
-        deposit_strategy: Callable[[int], int] = lambda value: 10 * value
+        deposit_strategy: Callable[[int], int] = lambda value: 10 * value,
+        http_timeout: Tuple[float, float] = HTTP_TIMEOUT,
+        call_timeout: Tuple[float, float] = CALL_HTTP_TIMEOUT
     ) -> None:
         """Init Atn Class
 
+        :param http_timeout: (connect, read) timeout of channel sync and close requests to DBot servers, seconds
+        :param call_timeout: (connect, read) timeout of `call_dbot_api` and `call_dbot_api_async`, seconds,
+            a `timeout` passed to the call overrides it
         """
         logging.config.dictConfig(AtnLogger('atn').config())
 
-        w3 = Web3(HTTPProvider(http_provider))
+        self._http_timeout = http_timeout
+        self._call_timeout = call_timeout
+        # keep-alive connections shared by JSON-RPC and DBot server requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32,
+                              pool_maxsize=32,
+                              max_retries=Retry(total=2, backoff_factor=0.1),
+                              pool_block=True)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        w3 = Web3(_SessionHTTPProvider(http_provider, self._session))
         w3.middleware_stack.inject(geth_poa_middleware, layer=0)
 
         self.deposit_strategy = deposit_strategy
+        # name, domain and owner of a DBot contract never change, cache them per address
+        self._dbot_meta_cache = {}
+        # channel url on DBot server -> (conditional request headers, channel info)
+        self._channel_etag = {}
+        # (dbot_address, uri, method) -> (price, expire time)
+        self._price_cache = {}
+        # (dbot_address, uri, method) -> endpoint key, `getKey` is a pure function
+        self._endpoint_keys = {}
+        # dbot_address -> the open channel used by the last call
+        self._channel_cache = {}
+        # dbot_address -> lock held from signing a payment to the DBot until its request is sent,
+        # so the balance proofs reach the DBot server in order, `_payment_lock` guards the dict
+        self._dbot_locks = {}
+        self._payment_lock = threading.Lock()
+        # event loop -> dbot_address -> asyncio lock serializing the coroutines paying the DBot,
+        # an asyncio lock can only be used in its own loop
+        self._aio_dbot_locks = weakref.WeakKeyDictionary()
+        # `aiohttp` session of `call_dbot_api_async` and the event loop it runs in
+        self._aio_session = None
+        self._aio_loop = None
         self.channel_client = Client(
             private_key=pk_file,
             key_password_path=pw_file,
             web3=w3
         )
+        self._contract_address = self.channel_client.context.channel_manager.address
 
     def set_deposit_strategy(self, deposit_strategy: Callable[[int], int]) -> None:
         """Change deposit strategy.
@@ -91,19 +171,51 @@ class Atn():
         """
         self.deposit_strategy = deposit_strategy
 
+    def close(self) -> None:
+        """Close the HTTP connections kept alive for DBot servers and JSON-RPC
+
+        `Atn` can also be used as a context manager to close them on exit::
+
+          >>> with Atn(pk_file='<path to keystore file>', pw_file='<path to password file>') as atn:
+          >>>     resp = atn.call_dbot_api(DBOTADDRESS, URI, METHOD, **requests_kwargs)
+
+        The `aiohttp` session of `call_dbot_api_async` is closed too, in the
+        coroutine code prefer `await atn.aclose()`.
+        """
+        self._session.close()
+        if self._aio_session is not None:
+            session, loop = self._aio_session, self._aio_loop
+            self._aio_session = self._aio_loop = None
+            if loop.is_running():
+                # called by a coroutine or another thread, close it in its loop
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            elif not loop.is_closed():
+                loop.run_until_complete(session.close())
+
+    def __enter__(self) -> 'Atn':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
     def get_dbot_name(self, dbot_address: str) -> str:
         """Get the name of DBot according the address of DBot contract
         on ATN blockchain.
 
+        It's read from blockchain only once and cached per DBot.
+
         :param dbot_address: address of the DBot contract
         :return: name of the DBot
         :rtype: str
         """
-        dbot_address = Web3.toChecksumAddress(dbot_address)
-        w3 = self.channel_client.context.web3
-        Dbot = _make_dbot_contract(w3, dbot_address)
-        name = Dbot.functions.name().call()
-        return name.decode('utf-8').rstrip('\0')
+        dbot_address = _checksum(dbot_address)
+        meta = self._dbot_meta_cache.setdefault(dbot_address, {})
+        if 'name' not in meta:
+            w3 = self.channel_client.context.web3
+            Dbot = _make_dbot_contract(w3, dbot_address)
+            name = Dbot.functions.name().call()
+            meta['name'] = name.decode('utf-8').rstrip('\0')
+        return meta['name']
 
     def get_dbot_domain(self, dbot_address: str) -> str:
         """Get the domain of DBot according the address of DBot contract
@@ -112,15 +224,36 @@ class Atn():
         The DBot server should be accessed on the domain.
         The domain may contain `http://` or `https://` protocol prefix.
 
+        It's read from blockchain only once and cached per DBot.
+
         :param dbot_address: address of the DBot contract
         :return: domain of the DBot
         :rtype: str
         """
-        dbot_address = Web3.toChecksumAddress(dbot_address)
-        w3 = self.channel_client.context.web3
-        Dbot = _make_dbot_contract(w3, dbot_address)
-        domain = Dbot.functions.domain().call()
-        return domain.decode('utf-8').rstrip('\0')
+        dbot_address = _checksum(dbot_address)
+        meta = self._dbot_meta_cache.setdefault(dbot_address, {})
+        if 'domain' not in meta:
+            w3 = self.channel_client.context.web3
+            Dbot = _make_dbot_contract(w3, dbot_address)
+            domain = Dbot.functions.domain().call()
+            meta['domain'] = domain.decode('utf-8').rstrip('\0')
+        return meta['domain']
+
+    def get_dbot_url(self, dbot_address: str) -> str:
+        """Get the url of DBot server
+
+        It's the domain of DBot, prefixed with `http://` if no protocol in the domain.
+
+        :param dbot_address: address of the DBot contract
+        :return: url of the DBot server
+        :rtype: str
+        """
+        dbot_address = _checksum(dbot_address)
+        meta = self._dbot_meta_cache.setdefault(dbot_address, {})
+        if 'url' not in meta:
+            domain = self.get_dbot_domain(dbot_address)
+            meta['url'] = _normalize_url(domain)
+        return meta['url']
 
     def get_dbot_owner(self, dbot_address: str) -> str:
         """Get the owner account of DBot contract on ATN blockchain.
@@ -128,20 +261,55 @@ class Atn():
         Close signature should be signed by the owner of DBot
         when DBot user want to cooperative close the channel with DBot.
 
+        It's read from blockchain only once and cached per DBot.
+
         :param dbot_address: address of the DBot contract
         :return: account address of owner
         :rtype: str
         """
-        dbot_address = Web3.toChecksumAddress(dbot_address)
-        w3 = self.channel_client.context.web3
-        Dbot = _make_dbot_contract(w3, dbot_address)
-        owner = Dbot.functions.getOwner().call()
-        return owner
+        dbot_address = _checksum(dbot_address)
+        meta = self._dbot_meta_cache.setdefault(dbot_address, {})
+        if 'owner' not in meta:
+            w3 = self.channel_client.context.web3
+            Dbot = _make_dbot_contract(w3, dbot_address)
+            meta['owner'] = Dbot.functions.getOwner().call()
+        return meta['owner']
+
+    def get_dbot_info(self, dbot_address: str) -> Dict[str, str]:
+        """Get the name, domain, url and owner of DBot
+
+        The fields not cached yet are read from blockchain in one JSON-RPC batch
+        request, instead of one request for each of them.
+
+        :param dbot_address: address of the DBot contract
+        :return: dict with `name`, `domain`, `url` and `owner` of the DBot
+        :rtype: dict
+        """
+        dbot_address = _checksum(dbot_address)
+        meta = self._dbot_meta_cache.setdefault(dbot_address, {})
+        fields = [field for field in ('name', 'domain', 'owner') if field not in meta]
+        if fields:
+            w3 = self.channel_client.context.web3
+            Dbot = _make_dbot_contract(w3, dbot_address)
+            functions = {'name': Dbot.functions.name, 'domain': Dbot.functions.domain, 'owner': Dbot.functions.getOwner}
+            results = batch_call(w3, [functions[field]() for field in fields])
+            for field, value in zip(fields, results):
+                if field == 'owner':
+                    meta[field] = _checksum(value)
+                else:
+                    meta[field] = value.decode('utf-8').rstrip('\0')
+        return {
+            'name': meta['name'],
+            'domain': meta['domain'],
+            'url': self.get_dbot_url(dbot_address),
+            'owner': meta['owner'],
+        }
 
     def get_price(self, dbot_address: str, uri: str, method: str) -> int:
         """Get the price of a endpoint of the DBot
 
         The unit of price is `wei`, the smallest unit of ATN. 1ATN = 10^18wei
+        The price is cached for `PRICE_CACHE_TTL` seconds.
 
         :param dbot_address: address of the DBot contract
         :param uri: uri of the endpoint
@@ -150,71 +318,119 @@ class Atn():
         :rtype: int
         """
 
-        dbot_address = Web3.toChecksumAddress(dbot_address)
+        price, _ = self._fetch_dbot_state(_checksum(dbot_address), uri, method)
+        return price
+
+    def invalidate_price(self, dbot_address: str, uri: str, method: str) -> None:
+        """Drop the cached price of a endpoint of the DBot
+
+        The next `get_price` or `call_dbot_api` will read the price from blockchain again.
+
+        :param dbot_address: address of the DBot contract
+        :param uri: uri of the endpoint
+        :param method: method of the endpoint
+        """
+        self._price_cache.pop((_checksum(dbot_address), uri, method.lower()), None)
+
+    def prefetch_prices(self, dbot_address: str, endpoints: Iterable[Tuple[str, str]]) -> List[int]:
+        """Read the prices of many endpoints of the DBot in two JSON-RPC batch requests
+
+        All `getKey` calls are sent in one batch and all `keyToEndPoints` calls
+        in a second one. The prices are cached like those read by `get_price`,
+        so the following `call_dbot_api` to these endpoints need no more price lookups.
+
+        :param dbot_address: address of the DBot contract
+        :param endpoints: (uri, method) of the endpoints
+        :return: prices of the endpoints, in the order of `endpoints`
+        :rtype: list
+        """
+        dbot_address = _checksum(dbot_address)
+        endpoints = [(uri, method.lower()) for uri, method in endpoints]
+        prices = [self._cached_price(dbot_address, uri, method) for uri, method in endpoints]
+        missing = [(uri, method) for (uri, method), price in zip(endpoints, prices) if price is None]
+        if not missing:
+            return prices
         w3 = self.channel_client.context.web3
         Dbot = _make_dbot_contract(w3, dbot_address)
-        key = Dbot.functions.getKey(tobytes32(method.lower()), tobytes32(uri)).call()
-        endpoint = Dbot.functions.keyToEndPoints(key).call()
-        # TODO handle method case and how to check if the endpoint exist
-        if (int(endpoint[1]) == 0):
-            raise AtnException('no such endpoint: uri = {}, method = {}'.format(uri, method))
-        else:
-            return int(endpoint[1])
-
-    def get_dbot_channel(self, dbot_address: str) -> Channel:
+        unknown = [(uri, method) for uri, method in missing
+                   if (dbot_address, uri, method) not in self._endpoint_keys]
+        if unknown:
+            keys = batch_call(w3, [Dbot.functions.getKey(tobytes32(method), tobytes32(uri))
+                                   for uri, method in unknown])
+            for (uri, method), key in zip(unknown, keys):
+                self._endpoint_keys[(dbot_address, uri, method)] = key
+        endpoint_infos = batch_call(w3, [Dbot.functions.keyToEndPoints(self._endpoint_keys[(dbot_address, uri, method)])
+                                         for uri, method in missing])
+        fetched = {
+            (uri, method): self._cache_price(dbot_address, uri, method, self._endpoint_price(endpoint, uri, method))
+            for (uri, method), endpoint in zip(missing, endpoint_infos)
+        }
+        return [fetched[endpoint] if price is None else price for endpoint, price in zip(endpoints, prices)]
+
+    def get_dbot_channel(self, dbot_address: str, channel: Channel = None) -> Channel:
         """Get the channel information from DBot server
 
         DBot server saves the balance proof which send from DBot user.
         DBot users can get this from DBot server, no need to save by themselves.
 
         :param dbot_address: address of the DBot contract
+        :param channel: the channel on blockchain, looked up if it's `None`
         :return: :class:`Channel <Channel>` object
         :rtype: pyatn_client.Channel
         """
-        dbot_address = Web3.toChecksumAddress(dbot_address)
-        domain = self.get_dbot_domain(dbot_address)
-        channel = self.get_channel(dbot_address)
-        dbot_url = domain if domain.lower().startswith('http') else 'http://{}'.format(domain)
-        if channel is not None:
-            url = '{}/api/v1/dbots/{}/channels/{}/{}'.format(dbot_url,
-                                                             channel.receiver,
-                                                             channel.sender,
-                                                             channel.block
-                                                             )
-            resp = requests.get(url)
-            if resp.status_code == 200:
-                return resp.json()
-            else:
-                return None
-        else:
+        dbot_address = _checksum(dbot_address)
+        if channel is None:
+            channel = self.get_channel(dbot_address)
+        if channel is None:
             return None
-
-    def wait_dbot_sync(self, dbot_address: str, retry_interval: int=5, retry_times: int=5) -> None:
+        return self._request_dbot_channel(self._dbot_channel_url(self.get_dbot_url(dbot_address), channel))
+
+    def wait_dbot_sync(self,
+                       dbot_address: str,
+                       retry_interval: int=5,
+                       retry_times: int=5,
+                       deposit: int=None,
+                       channel: Channel=None
+                       ) -> None:
         """Wait the DBot server to sync the channel info on blockchain
 
         DBot server will sync the channel info on blockchain, and
+        the channel state is polled with exponential backoff,
+        starting at `SYNC_RETRY_BASE_INTERVAL` and capped by `retry_interval`,
+        for at most `retry_interval * retry_times` seconds.
 
         :param dbot_address: address of the DBot contract
-        :param retry_interval: interval time for retry, seconds
+        :param retry_interval: max interval time for retry, seconds
         :param retry_times:  how many times to retry
+        :param deposit: the deposit expected on DBot server, default is the deposit on chain
+        :param channel: the channel on blockchain, looked up if it's `None`
         """
-        dbot_address = Web3.toChecksumAddress(dbot_address)
-        channel = self.get_channel(dbot_address)
+        dbot_address = _checksum(dbot_address)
         if channel is None:
-            logger.warning('No Channel with dbot({}) on chain'.format(dbot_address))
+            channel = self.get_channel(dbot_address)
+        if channel is None:
+            logger.warning('No Channel with dbot(%s) on chain', dbot_address)
             return
-        dbot_channel = self.get_dbot_channel(dbot_address)
-        remain_times = retry_times
-        while retry_times > 0 and (dbot_channel is None or int(dbot_channel['deposit']) != channel.deposit):
-            logger.info('Channel state with dbot({}) has not synced by dbot server, retry after {}s'.format(
-                dbot_address, retry_interval))
-            remain_times = remain_times - 1
-            time.sleep(retry_interval)
-            dbot_channel = self.get_dbot_channel(dbot_address)
-        if dbot_channel is not None and int(dbot_channel['deposit']) == channel.deposit:
-            channel.update_balance(int(dbot_channel['balance']))
-        else:
+        if deposit is None:
+            deposit = channel.deposit
+        url = self._dbot_channel_url(self.get_dbot_url(dbot_address), channel)
+        deadline = time.monotonic() + retry_interval * retry_times
+        base = SYNC_RETRY_BASE_INTERVAL
+        retry = 0
+        dbot_channel = self._request_dbot_channel(url)
+        while dbot_channel is None or int(dbot_channel['deposit']) != deposit:
+            remain = deadline - time.monotonic()
+            if remain <= 0:
+                break
+            delay = min(remain, min(retry_interval, base * 2 ** retry) + random.uniform(0, base))
+            logger.info('Channel state with dbot(%s) has not synced by dbot server, retry after %.2fs',
+                        dbot_address, delay)
+            retry = retry + 1
+            time.sleep(delay)
+            dbot_channel = self._request_dbot_channel(url)
+        if dbot_channel is None or int(dbot_channel['deposit']) != deposit:
             raise AtnException('Channel state with dbot({}) can not synced by dbot server.'.format(dbot_address))
+        channel.update_balance(int(dbot_channel['balance']))
 
     def call_dbot_api(self, dbot_address: str, uri: str, method: str, **requests_kwargs) -> Response:
         """Send the API's HTTP request
@@ -231,14 +447,97 @@ class Atn():
         :return: :class:`Response <Response>` object, http response of the API
         :rtype: requests.Response
         """
-        dbot_address = Web3.toChecksumAddress(dbot_address)
-        price = self.get_price(dbot_address, uri, method)
-        channel = self._get_suitable_channel(dbot_address, price)
-        channel.create_transfer(price)
-        domain = self.get_dbot_domain(dbot_address)
-        dbot_url = domain if domain.lower().startswith('http') else 'http://{}'.format(domain)
-        url = '{}/call/{}/{}'.format(dbot_url, dbot_address, remove_slash_prefix(uri))
-        return self._request(channel, method, url, **requests_kwargs)
+        dbot_address = _checksum(dbot_address)
+        with self._dbot_lock(dbot_address):
+            try:
+                _, url, headers = self._prepare_call(dbot_address, uri, method)
+                resp = self._request(headers, method, url, **requests_kwargs)
+            except BaseException:
+                self._drop_call_cache(dbot_address, uri, method)
+                raise
+            if not 200 <= resp.status_code < 300:
+                self._drop_call_cache(dbot_address, uri, method)
+            return resp
+
+    async def call_dbot_api_async(self, dbot_address: str, uri: str, method: str, **requests_kwargs):
+        """Send the API's HTTP request asynchronously
+
+        Same as `call_dbot_api`, but the on-chain work runs in the default
+        executor and the HTTP request is sent with `aiohttp`, so calls to
+        different DBots can overlap their I/O.
+        Calls to the same DBot are paid and sent one by one, in order.
+
+        :param dbot_address: address of the DBot contract
+        :param uri: uri of the endpoint
+        :param method: method of the endpoint
+        :param requests_kwargs: the other args for http request is same with `aiohttp`
+        :return: :class:`ClientResponse <ClientResponse>` object, with the body already read
+        :rtype: aiohttp.ClientResponse
+        """
+        dbot_address = _checksum(dbot_address)
+        loop = asyncio.get_event_loop()
+        aio_locks = self._aio_dbot_locks.setdefault(loop, {})
+        aio_lock = aio_locks.get(dbot_address)
+        if aio_lock is None:
+            aio_lock = aio_locks[dbot_address] = asyncio.Lock()
+        lock = self._dbot_lock(dbot_address)
+        async with aio_lock:
+            # only one coroutine per DBot waits for the lock, held by `call_dbot_api` in other threads
+            prepared = loop.run_in_executor(None, self._locked_prepare_call, lock, dbot_address, uri, method)
+            try:
+                _, url, headers = await asyncio.shield(prepared)
+            except asyncio.CancelledError:
+                prepared.add_done_callback(functools.partial(self._release_prepared, lock, dbot_address, uri, method))
+                raise
+            try:
+                user_headers = requests_kwargs.get('headers')
+                if user_headers:
+                    headers.update(user_headers)
+                requests_kwargs['headers'] = headers
+
+                session = self._get_aio_session()
+                resp = await session.request(method, url, **requests_kwargs)
+            except BaseException:
+                self._drop_call_cache(dbot_address, uri, method)
+                raise
+            else:
+                if not 200 <= resp.status < 300:
+                    self._drop_call_cache(dbot_address, uri, method)
+            finally:
+                lock.release()
+        await resp.read()
+        resp.release()
+        return resp
+
+    async def gather(self, calls: Iterable[dict], concurrency: int = 8) -> List:
+        """Call many DBot APIs concurrently
+
+        Usage::
+
+          >>> responses = asyncio.get_event_loop().run_until_complete(atn.gather([
+          >>>     {'dbot_address': DBOTADDRESS, 'uri': '/reg', 'method': 'POST', 'data': {'theme': '月'}},
+          >>>     {'dbot_address': DBOTADDRESS, 'uri': '/reg', 'method': 'POST', 'data': {'theme': '花'}},
+          >>> ]))
+
+        :param calls: keyword arguments of `call_dbot_api_async` for each call
+        :param concurrency: max number of calls in flight
+        :return: responses in the order of `calls`
+        :rtype: list
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _call(kwargs):
+            async with semaphore:
+                return await self.call_dbot_api_async(**kwargs)
+
+        return await asyncio.gather(*[_call(dict(kwargs)) for kwargs in calls])
+
+    async def aclose(self) -> None:
+        """Close the `aiohttp` session used by `call_dbot_api_async`"""
+        if self._aio_session is not None:
+            session = self._aio_session
+            self._aio_session = self._aio_loop = None
+            await session.close()
 
     def open_channel(self, dbot_address: str, deposit: int) -> Channel:
         """Open a channel with the DBot
@@ -282,27 +581,27 @@ class Atn():
 
         :param dbot_address: address of the DBot contract
         """
+        dbot_address = _checksum(dbot_address)
+        self._channel_cache.pop(dbot_address, None)
         channel = self.get_channel(dbot_address)
         if channel is None:
             logger.error('No channel to close.')
             return
 
         try:
-            self.wait_dbot_sync(dbot_address)
+            self.wait_dbot_sync(dbot_address, channel=channel)
         except Exception as err:
-            logger.error('Dbot server can not sync the channel')
-            self.on_cooperative_close_denied(dbot_address, response)
-        domain = self.get_dbot_domain(dbot_address)
-        dbot_url = domain if domain.lower().startswith('http') else 'http://{}'.format(domain)
+            logger.error('Dbot server can not sync the channel: %s', err)
+            self.on_cooperative_close_denied(dbot_address)
+            return
+        dbot_url = self.get_dbot_url(dbot_address)
 
         logger.debug(
-            'Requesting closing signature from server for balance {} on channel {}/{}/{}.'
-            .format(
-                channel.balance,
-                channel.receiver,
-                channel.sender,
-                channel.block
-            )
+            'Requesting closing signature from server for balance %s on channel %s/%s/%s.',
+            channel.balance,
+            channel.receiver,
+            channel.sender,
+            channel.block
         )
         url = '{}/api/v1/channels/{}/{}/{}'.format(
             dbot_url,
@@ -312,21 +611,22 @@ class Atn():
         )
 
         try:
-            response = requests.request(
+            response = self._session.request(
                 'DELETE',
                 url,
-                params={'balance': channel.balance}
+                params={'balance': channel.balance},
+                timeout=self._http_timeout
             )
-        except requests.exceptions.ConnectionError as err:
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
             logger.error(
-                'Could not get a response from the server while requesting a closing signature: {}'
-                .format(err)
+                'Could not get a response from the server while requesting a closing signature: %s',
+                err
             )
             response = None
 
         failed = True
         if response is not None and response.status_code == requests.codes.OK:
-            closing_sig = response.json()['close_signature']
+            closing_sig = _json_lib.loads(response.content)['close_signature']
             dbot_owner = self.get_dbot_owner(dbot_address)
             failed = channel.close_cooperatively(decode_hex(closing_sig), dbot_owner) is None
 
@@ -336,6 +636,19 @@ class Atn():
         else:
             logger.info('Cooperative close channel successfully')
 
+    def close_all(self, dbot_addresses: Iterable[str], max_workers: int = 8) -> None:
+        """Close the channels with many DBots concurrently
+
+        Same as calling `close_channel` for each DBot, but the requests of
+        closing signature and the waiting for confirmation events on blockchain
+        run in a thread pool. Transactions are still signed and sent one by one.
+
+        :param dbot_addresses: addresses of the DBot contracts
+        :param max_workers: max number of channels closing at the same time
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(self.close_channel, dbot_addresses))
+
     def on_cooperative_close_denied(self, dbot_address: str, response: Response = None) -> None:
         """Call back function when no valid closing signature received
 
@@ -345,7 +658,8 @@ class Atn():
         :param dbot_address: address of the DBot contract
         :param response: response from DBot server when request closing signature
         """
-        logger.warning('No valid closing signature received from DBot server({}).\n{}'.format(dbot_address, response.text))
+        logger.warning('No valid closing signature received from DBot server(%s).\n%s',
+                       dbot_address, response.text if response is not None else '')
         logger.warning('Closing noncooperatively on a balance of 0.')
         # if cooperative close denied, client close the channel with balance 0 unilaterally
         self.uncooperative_close_channel(dbot_address, 0)
@@ -360,6 +674,7 @@ class Atn():
         :param dbot_address: address of the DBot contract
         :param balance: used balance of the channel
         """
+        self._channel_cache.pop(_checksum(dbot_address), None)
         channel = self.get_channel(dbot_address)
         if channel is None:
             logger.error('No channel to close.')
@@ -373,6 +688,7 @@ class Atn():
 
         :param dbot_address: address of the DBot contract
         """
+        self._channel_cache.pop(_checksum(dbot_address), None)
         channel = self.get_channel(dbot_address)
         if channel is None:
             logger.error('No channel to settle.')
@@ -387,11 +703,138 @@ class Atn():
         :rtype: Channel
         """
         open_channels = self.channel_client.get_channels(dbot_address)
-        if open_channels:
-            channel = open_channels[0]
-            return channel
+        return open_channels[0] if open_channels else None
+
+    def _dbot_lock(self, dbot_address: str) -> threading.Lock:
+        lock = self._dbot_locks.get(dbot_address)
+        if lock is None:
+            with self._payment_lock:
+                lock = self._dbot_locks.setdefault(dbot_address, threading.Lock())
+        return lock
+
+    def _locked_prepare_call(self, lock: threading.Lock, dbot_address: str, uri: str, method: str):
+        """`_prepare_call` with the lock of the DBot acquired, it's still held on return"""
+        lock.acquire()
+        try:
+            return self._prepare_call(dbot_address, uri, method)
+        except BaseException:
+            self._drop_call_cache(dbot_address, uri, method)
+            lock.release()
+            raise
+
+    def _release_prepared(
+            self, lock: threading.Lock, dbot_address: str, uri: str, method: str, prepared: asyncio.Future
+    ) -> None:
+        # the call was cancelled while preparing, its payment is never sent,
+        # drop the cached channel and release the lock once the payment is prepared
+        self._drop_call_cache(dbot_address, uri, method)
+        # a cancelled executor future never ran `_locked_prepare_call`, the lock was not acquired
+        if not prepared.cancelled() and prepared.exception() is None:
+            lock.release()
+
+    def _drop_call_cache(self, dbot_address: str, uri: str, method: str) -> None:
+        # the DBot server may not have taken the payment of a failed call, or the price may have changed,
+        # sync the channel and read the price again on the next call
+        self._channel_cache.pop(dbot_address, None)
+        self._price_cache.pop((dbot_address, uri, method.lower()), None)
+
+    def _prepare_call(self, dbot_address: str, uri: str, method: str) -> Tuple[Channel, str, Dict[str, str]]:
+        """Pay the price of the endpoint, return the channel, url and payment headers of the call
+
+        The lock of the DBot must be held until the request has been sent,
+        the headers are a snapshot of the balance proof signed here.
+        """
+        price, _ = self._fetch_dbot_state(dbot_address, uri, method)
+        channel = self._get_suitable_channel(dbot_address, price)
+        channel.create_transfer(price)
+        url = '{}/call/{}/{}'.format(self.get_dbot_url(dbot_address), dbot_address, remove_slash_prefix(uri))
+        return channel, url, self._payment_headers(channel)
+
+    def _get_aio_session(self):
+        if self._aio_session is None:
+            try:
+                import aiohttp
+            except ImportError:
+                raise AtnException('aiohttp is required by async API, install it by `pip install pyatn-client[async]`')
+            connect_timeout, read_timeout = self._call_timeout
+            self._aio_loop = asyncio.get_event_loop()
+            self._aio_session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+            )
+        return self._aio_session
+
+    def _fetch_dbot_state(self, dbot_address: str, uri: str, method: str) -> Tuple[int, str]:
+        """Get the price of the endpoint and the domain of the DBot
+
+        `getKey` and `domain` are sent in one JSON-RPC batch request,
+        `keyToEndPoints` depends on the key so it follows in a second one.
+        The key is cached, so refreshing an expired price takes only
+        the `keyToEndPoints` call.
+        """
+        method = method.lower()
+        price = self._cached_price(dbot_address, uri, method)
+        if price is not None:
+            return price, self.get_dbot_domain(dbot_address)
+        w3 = self.channel_client.context.web3
+        Dbot = _make_dbot_contract(w3, dbot_address)
+        meta = self._dbot_meta_cache.setdefault(dbot_address, {})
+        key = self._endpoint_keys.get((dbot_address, uri, method))
+        calls = []
+        if key is None:
+            calls.append(Dbot.functions.getKey(tobytes32(method), tobytes32(uri)))
+        if 'domain' not in meta:
+            calls.append(Dbot.functions.domain())
+        if calls:
+            results = batch_call(w3, calls)
+            if key is None:
+                key = self._endpoint_keys[(dbot_address, uri, method)] = results.pop(0)
+            if 'domain' not in meta:
+                meta['domain'] = results[0].decode('utf-8').rstrip('\0')
+        endpoint = Dbot.functions.keyToEndPoints(key).call()
+        price = self._cache_price(dbot_address, uri, method, self._endpoint_price(endpoint, uri, method))
+        return price, meta['domain']
+
+    # `method` of the price cache helpers is lower case already
+    def _cached_price(self, dbot_address: str, uri: str, method: str) -> int:
+        cached = self._price_cache.get((dbot_address, uri, method))
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    def _cache_price(self, dbot_address: str, uri: str, method: str, price: int) -> int:
+        self._price_cache[(dbot_address, uri, method)] = (price, time.monotonic() + PRICE_CACHE_TTL)
+        return price
+
+    def _endpoint_price(self, endpoint, uri: str, method: str) -> int:
+        # TODO handle method case and how to check if the endpoint exist
+        if (int(endpoint[1]) == 0):
+            raise AtnException('no such endpoint: uri = {}, method = {}'.format(uri, method))
         else:
+            return int(endpoint[1])
+
+    def _dbot_channel_url(self, dbot_url: str, channel: Channel) -> str:
+        return '{}/api/v1/dbots/{}/channels/{}/{}'.format(dbot_url,
+                                                          channel.receiver,
+                                                          channel.sender,
+                                                          channel.block
+                                                          )
+
+    def _request_dbot_channel(self, url: str) -> dict:
+        cached = self._channel_etag.get(url)
+        resp = self._session.get(url, headers=cached[0] if cached else None, timeout=self._http_timeout)
+        if resp.status_code == 304 and cached is not None:
+            return cached[1]
+        if resp.status_code != 200:
             return None
+        dbot_channel = _json_lib.loads(resp.content)
+        validators = {}
+        if 'ETag' in resp.headers:
+            validators['If-None-Match'] = resp.headers['ETag']
+        if 'Last-Modified' in resp.headers:
+            validators['If-Modified-Since'] = resp.headers['Last-Modified']
+        if validators:
+            self._channel_etag[url] = (validators, dbot_channel)
+        return dbot_channel
 
     def _get_suitable_channel(self,
                              dbot_address: str,
@@ -400,52 +843,60 @@ class Atn():
         if self.deposit_strategy is None:
             channel = self.get_channel(dbot_address)
             if channel is None:
-                logger.error('No channel was found with DBot({}), please create a channel first'.format(dbot_address))
+                logger.error('No channel was found with DBot(%s), please create a channel first', dbot_address)
                 raise AtnException('No channel was found with DBot({})'.format(dbot_address))
             if not channel.is_suitable(price):
-                logger.error('Insufficient balance in the channel (remain balance = {}), please topup first'.format(
-                    channel.remain_balance()))
+                logger.error('Insufficient balance in the channel (remain balance = %s), please topup first',
+                             channel.remain_balance())
                 raise AtnException('Insufficient balance in the channel (remain balance = {}), please topup first'.format(
                     channel.remain_balance()))
             return channel
-        else:
-            channel = self.channel_client.get_suitable_channel(
-                dbot_address, price, self.deposit_strategy, self.deposit_strategy
-            )
-            if channel is None:
-                logger.error("No channel could be created or sufficiently topped up.")
-                raise AtnException('No channel could be created or sufficiently topped up.')
 
-            self.wait_dbot_sync(dbot_address)
-            if channel.remain_balance() < price:
-                channel.topup(self.deposit_strategy(price))
-                self.wait_dbot_sync(dbot_address)
+        # a cached channel stays in sync with DBot server while the paid calls succeed,
+        # a failed call drops it from the cache, so the next call waits DBot server again
+        channel = self._channel_cache.get(dbot_address)
+        if channel is not None and channel.state == Channel.State.open and channel.is_suitable(price):
             return channel
 
+        channel = self.channel_client.get_suitable_channel(
+            dbot_address, price, self.deposit_strategy, self.deposit_strategy
+        )
+        if channel is None:
+            logger.error("No channel could be created or sufficiently topped up.")
+            raise AtnException('No channel could be created or sufficiently topped up.')
+
+        self.wait_dbot_sync(dbot_address, channel=channel)
+        if channel.remain_balance() < price:
+            channel.topup(self.deposit_strategy(price))
+            self.wait_dbot_sync(dbot_address, deposit=channel.deposit, channel=channel)
+        self._channel_cache[dbot_address] = channel
+        return channel
+
     def _request(
             self,
-            channel: Channel,
+            payment_headers: Dict[str, str],
             method: str,
             url: str,
             **requests_kwargs
-    ) -> Tuple[Union[None, Response], bool]:
+    ) -> Response:
         """
-        Performs a simple request to the HTTP server with headers representing the given
-        channel state.
+        Performs a simple request to the HTTP server with the payment headers
+        of the channel state.
         """
-        headers = Munch()
-        headers.contract_address = self.channel_client.context.channel_manager.address
+        user_headers = requests_kwargs.get('headers')
+        if user_headers:
+            payment_headers.update(user_headers)
+        requests_kwargs['headers'] = payment_headers
+        requests_kwargs.setdefault('timeout', self._call_timeout)
+        return self._session.request(method, url, **requests_kwargs)
+
+    def _payment_headers(self, channel: Channel) -> Dict[str, str]:
+        # same as HTTPHeaders.serialize, but built directly with the header names
+        headers = {HTTPHeaders.CONTRACT_ADDRESS: self._contract_address}
         if channel is not None:
-            headers.balance = str(channel.balance)
-            headers.balance_signature = encode_hex(channel.balance_sig)
-            headers.sender_address = channel.sender
-            headers.receiver_address = channel.receiver
-            headers.open_block = str(channel.block)
-
-        headers = HTTPHeaders.serialize(headers)
-        if 'headers' in requests_kwargs:
-            headers.update(requests_kwargs['headers'])
-            requests_kwargs['headers'] = headers
-        else:
-            requests_kwargs['headers'] = headers
-        return requests.request(method, url, **requests_kwargs)
+            headers[HTTPHeaders.BALANCE] = str(channel.balance)
+            headers[HTTPHeaders.BALANCE_SIGNATURE] = channel.balance_sig_hex
+            headers[HTTPHeaders.SENDER_ADDRESS] = channel.sender
+            headers[HTTPHeaders.RECEIVER_ADDRESS] = channel.receiver
+            headers[HTTPHeaders.OPEN_BLOCK] = str(channel.block)
+        return headers
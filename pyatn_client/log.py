@@ -2,67 +2,117 @@
 # -*- coding: utf-8 -*-
 
 import os
+import copy
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
 LOGPATH = os.path.join(os.path.dirname(__file__), 'logs')
 os.makedirs(LOGPATH, exist_ok=True)
 
+_LISTENERS = {}
+"""dict: log file name -> the :class:`QueueListener` writing it"""
+
+
+def _stop_listeners():
+    for listener in _LISTENERS.values():
+        listener.stop()
+    _LISTENERS.clear()
+
+
+atexit.register(_stop_listeners)
+
+
+def queued_file_handler(filename: str, **kwargs) -> QueueHandler:
+    """Make a handler which enqueues records for a RotatingFileHandler
+
+    The file is written and rotated by a :class:`QueueListener` thread,
+    so logging in the caller never waits for disk writes or rollover.
+    Configuring the same file again replaces its listener but keeps its queue,
+    so the records enqueued by the old handler before it is swapped out are
+    still written.
+
+    :param filename: log file name
+    :param kwargs: the other args of :class:`RotatingFileHandler`
+    :return: :class:`QueueHandler` object
+    """
+    old = _LISTENERS.pop(filename, None)
+    if old is not None:
+        # the old listener writes the records up to its stop sentinel, the new one the rest
+        old.stop()
+        for handler in old.handlers:
+            handler.close()
+        records = old.queue
+    else:
+        records = queue.Queue(-1)
+    listener = QueueListener(records, RotatingFileHandler(filename, **kwargs))
+    listener.start()
+    _LISTENERS[filename] = listener
+    return QueueHandler(records)
+
+
+_CONFIG = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '%(asctime)s %(name)s(%(levelname)s) %(message)s (%(filename)s[%(lineno)d])'
+        },
+        'normal': {
+            'format': '%(asctime)s %(levelname)-8s %(message)s'
+        },
+        'simple': {
+            'format': '%(levelname)s %(message)s'
+        },
+    },
+    'handlers': {
+        'console':{
+            'level': 'INFO',
+            'class':'logging.StreamHandler',
+            'formatter': 'simple'
+        },
+        'info_file': {
+            'level': 'INFO',
+            '()': queued_file_handler,
+            'formatter': 'normal',
+            'encoding': 'utf8',
+            'mode': 'a',
+            'maxBytes': 10485760,
+            'backupCount': 5
+        },
+        'debug_file': {
+            'level': 'DEBUG',
+            '()': queued_file_handler,
+            'formatter': 'verbose',
+            'encoding': 'utf8',
+            'mode': 'a',
+            'maxBytes': 10485760,
+            'backupCount': 20
+        },
+    },
+    'loggers': {
+        'atn': {
+            'handlers': ['console', 'info_file', 'debug_file'],
+            'level': 'DEBUG',
+            'propagate': False
+        }
+    },
+    'root': {
+        'handlers': ['console', 'info_file', 'debug_file'],
+        'level': 'DEBUG',
+    }
+}
+"""dict: logging config shared by all loggers, only the file names differ"""
+
+
 class AtnLogger():
     def __init__(self, name: str):
         self._name = name
 
     def config(self):
-        return {
-            'version': 1,
-            'disable_existing_loggers': False,
-            'formatters': {
-                'verbose': {
-                    'format': '%(asctime)s %(name)s(%(levelname)s) %(message)s (%(filename)s[%(lineno)d])'
-                },
-                'normal': {
-                    'format': '%(asctime)s %(levelname)-8s %(message)s'
-                },
-                'simple': {
-                    'format': '%(levelname)s %(message)s'
-                },
-            },
-            'handlers': {
-                'console':{
-                    'level': 'INFO',
-                    'class':'logging.StreamHandler',
-                    'formatter': 'simple'
-                },
-                'info_file': {
-                    'level': 'INFO',
-                    'class': 'logging.handlers.RotatingFileHandler',
-                    'formatter': 'normal',
-                    'filename': os.path.join(LOGPATH, '{}.log'.format(self._name)),
-                    'encoding': 'utf8',
-                    'mode': 'a',
-                    'maxBytes': 10485760,
-                    'backupCount': 5
-                },
-                'debug_file': {
-                    'level': 'DEBUG',
-                    'class': 'logging.handlers.RotatingFileHandler',
-                    'formatter': 'verbose',
-                    'filename': os.path.join(LOGPATH, '{}_debug.log'.format(self._name)),
-                    'encoding': 'utf8',
-                    'mode': 'a',
-                    'maxBytes': 10485760,
-                    'backupCount': 20
-                },
-            },
-            'loggers': {
-                'atn': {
-                    'handlers': ['console', 'info_file', 'debug_file'],
-                    'level': 'DEBUG',
-                    'propagate': False
-                }
-            },
-            'root': {
-                'handlers': ['console', 'info_file', 'debug_file'],
-                'level': 'DEBUG',
-            }
-        }
+        config = copy.deepcopy(_CONFIG)
+        handlers = config['handlers']
+        handlers['info_file']['filename'] = os.path.join(LOGPATH, '{}.log'.format(self._name))
+        handlers['debug_file']['filename'] = os.path.join(LOGPATH, '{}_debug.log'.format(self._name))
+        return config
@@ -2,13 +2,12 @@ import os
 import logging
 from enum import Enum
 
-from eth_utils import decode_hex, is_same_address
+from eth_utils import is_same_address
 from typing import Callable
 
 from .context import Context
 from ..utils import (
     get_event_blocking,
-    signed_contract_transaction,
     sign_balance_proof,
     verify_closing_sig,
     keccak256
@@ -35,6 +34,10 @@ class Channel:
     ):
         self._balance = 0
         self._balance_sig = None
+        self._balance_sig_hex = None
+        # (receiver, block, balance, contract) the balance signature was made for
+        self._sig_state = None
+        self._key = None
 
         self.core = core
         self.sender = sender
@@ -46,7 +49,6 @@ class Channel:
         self.on_settle = on_settle
 
         assert self.block is not None
-        assert self._balance_sig
 
     @property
     def balance(self):
@@ -54,16 +56,25 @@ class Channel:
 
     @property
     def key(self) -> bytes:
-        return keccak256(self.sender, self.receiver, self.block)
+        # sender, receiver and block identify the channel and never change
+        if self._key is None:
+            self._key = keccak256(self.sender, self.receiver, self.block)
+        return self._key
 
     def update_balance(self, value):
         self._balance = value
         self._balance_sig = self.sign()
+        self._balance_sig_hex = '0x' + self._balance_sig.hex()
+        self._sig_state = self._balance_proof_state()
 
     @property
     def balance_sig(self):
         return self._balance_sig
 
+    @property
+    def balance_sig_hex(self) -> str:
+        return self._balance_sig_hex
+
     def sign(self):
         sig =  sign_balance_proof(
             self.core.private_key,
@@ -95,11 +106,7 @@ class Channel:
         ))
         current_block = self.core.web3.eth.blockNumber
 
-        data = (decode_hex(self.sender) +
-                decode_hex(self.receiver) +
-                self.block.to_bytes(4, byteorder='big'))
-        tx = signed_contract_transaction(
-            self.core.account,
+        self.core.send_contract_transaction(
             self.core.channel_manager,
             'topUp(address,uint32)',
             [
@@ -108,7 +115,6 @@ class Channel:
             ],
             deposit
         )
-        self.core.web3.eth.sendRawTransaction(tx.rawTransaction)
 
         logger.debug('Waiting for topup confirmation event...')
         event = get_event_blocking(
@@ -146,8 +152,7 @@ class Channel:
         if balance is not None:
             self.update_balance(balance)
 
-        tx = signed_contract_transaction(
-            self.core.account,
+        self.core.send_contract_transaction(
             self.core.channel_manager,
             'uncooperativeClose(address,uint32,uint256)',
             [
@@ -156,7 +161,6 @@ class Channel:
                 self.balance
             ]
         )
-        self.core.web3.eth.sendRawTransaction(tx.rawTransaction)
 
         logger.debug('Waiting for close confirmation event...')
         event = get_event_blocking(
@@ -212,8 +216,7 @@ class Channel:
                 logger.error('Invalid closing signature.')
                 return None
 
-        tx = signed_contract_transaction(
-            self.core.account,
+        self.core.send_contract_transaction(
             self.core.channel_manager,
             'cooperativeClose(address,uint32,uint256,bytes,bytes)',
             [
@@ -224,7 +227,6 @@ class Channel:
                 closing_sig
             ]
         )
-        self.core.web3.eth.sendRawTransaction(tx.rawTransaction)
 
         logger.debug('Waiting for settle confirmation event...')
         event = get_event_blocking(
@@ -271,8 +273,7 @@ class Channel:
             ))
             return None
 
-        tx = signed_contract_transaction(
-            self.core.account,
+        self.core.send_contract_transaction(
             self.core.channel_manager,
             'settle(address,uint32)',
             [
@@ -280,7 +281,6 @@ class Channel:
                 self.block
             ]
         )
-        self.core.web3.eth.sendRawTransaction(tx.rawTransaction)
 
         logger.debug('Waiting for settle confirmation event...')
         event = get_event_blocking(
@@ -308,7 +308,8 @@ class Channel:
         Updates the given channel's balance and balance signature with the new value. The signature
         is returned and stored in the channel state.
         """
-        assert value >= 0
+        if value < 0:
+            raise ValueError('Transfer value must not be negative: {}'.format(value))
         if self.remain_balance() < value:
             logger.error(
                 'Insufficient funds on channel. Needed: {}. Available: {}/{}.'
@@ -328,8 +329,12 @@ class Channel:
 
         return self.balance_sig
 
+    def _balance_proof_state(self) -> tuple:
+        return self.receiver, self.block, self._balance, self.core.channel_manager.address
+
     def is_valid(self) -> bool:
-        return self.sign() == self.balance_sig and self.balance <= self.deposit
+        # the signature is deterministic, so it's valid while the signed fields are unchanged
+        return self._sig_state == self._balance_proof_state() and self.balance <= self.deposit
 
     def remain_balance(self) -> int:
         return self.deposit - self.balance
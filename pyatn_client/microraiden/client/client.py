@@ -11,9 +11,7 @@ from web3.utils.filters import Filter
 from ..utils import (
     get_private_key,
     get_logs,
-    get_event_blocking,
-    signed_contract_transaction,
-    signed_contract_transaction
+    get_event_blocking
 )
 
 from ..config import NETWORK_CFG
@@ -152,8 +150,7 @@ class Client:
             receiver_address, deposit, current_block
         ))
 
-        tx = signed_contract_transaction(
-            self.context.account,
+        ret = self.context.send_contract_transaction(
             self.context.channel_manager,
             'createChannel(address)',
             [
@@ -161,7 +158,6 @@ class Client:
             ],
             deposit
         )
-        ret = self.context.web3.eth.sendRawTransaction(tx.rawTransaction)
         logger.info('transaction hash: {}'.format(Web3.toHex(ret)))
 
         logger.debug('Waiting for channel creation event on the blockchain...')
@@ -1,9 +1,26 @@
 import os
 import json
+import time
+import functools
+import threading
+from typing import Any, Dict, List
 from web3 import Web3
+from web3.contract import Contract
 
 from ..constants import CONTRACT_METADATA, CHANNEL_MANAGER_NAME
-from ..utils import privkey_to_addr
+from ..utils import privkey_to_addr, signed_contract_transaction
+
+GAS_PRICE_TTL = 15
+"""int: seconds to reuse the gas price read from the node"""
+
+
+@functools.lru_cache(maxsize=16)
+def _channel_manager_contract(web3: Web3, channel_manager_address: str) -> Contract:
+    # the ABI is parsed into contract functions and events once per web3 and address
+    return web3.eth.contract(
+        address=channel_manager_address,
+        abi=CONTRACT_METADATA[CHANNEL_MANAGER_NAME]['abi']
+    )
 
 
 class Context(object):
@@ -17,8 +34,42 @@ class Context(object):
         self.address = privkey_to_addr(private_key)
         self.web3 = web3
         self.account = web3.eth.account.privateKeyToAccount(private_key)
+        # serialize nonce lookup, signing and sending of transactions from this account
+        self.tx_lock = threading.Lock()
+        # (gas price, expire time) and the nonce of the next transaction, guarded by `tx_lock`
+        self._gas_price = None
+        self._nonce = None
+
+        self.channel_manager = _channel_manager_contract(web3, channel_manager_address)
 
-        self.channel_manager = web3.eth.contract(
-            address=channel_manager_address,
-            abi=CONTRACT_METADATA[CHANNEL_MANAGER_NAME]['abi']
-        )
+    def tx_params(self) -> Dict[str, int]:
+        """Nonce and gas price of the next transaction, must be called with `tx_lock` held
+
+        The nonce is read from the node once and then counted locally,
+        the gas price is read again after `GAS_PRICE_TTL` seconds.
+        """
+        now = time.monotonic()
+        if self._gas_price is None or self._gas_price[1] <= now:
+            self._gas_price = (self.web3.eth.gasPrice, now + GAS_PRICE_TTL)
+        if self._nonce is None:
+            self._nonce = self.web3.eth.getTransactionCount(self.account.address, 'pending')
+        return {'nonce': self._nonce, 'gas_price': self._gas_price[0]}
+
+    def send_contract_transaction(
+            self,
+            contract: Contract,
+            func_sig: str,
+            args: List[Any],
+            value: int = 0
+    ) -> bytes:
+        """Sign and send a contract transaction from this account, return the transaction hash"""
+        with self.tx_lock:
+            tx = signed_contract_transaction(self.account, contract, func_sig, args, value, **self.tx_params())
+            try:
+                tx_hash = self.web3.eth.sendRawTransaction(tx.rawTransaction)
+            except Exception:
+                # e.g. nonce too low when the account sent transactions elsewhere, read it again next time
+                self._nonce = None
+                raise
+            self._nonce += 1
+        return tx_hash
@@ -4,6 +4,11 @@ This file contains configuration constants you probably don't need to change
 import json
 import os
 
+try:
+    import orjson as _json_lib
+except ImportError:
+    _json_lib = json
+
 def read_version(path: str):
     return open(path, 'r').read().strip()
 
@@ -29,8 +34,8 @@ CHANNEL_MANAGER_NAME = 'TransferChannels'
 CONTRACTS_JSON = 'contracts.json'
 """str: compiled contracts path"""
 
-with open(os.path.join(os.path.abspath(os.path.dirname(__file__)), CONTRACTS_JSON)) as fh:
-    CONTRACT_METADATA = json.load(fh)
+with open(os.path.join(os.path.abspath(os.path.dirname(__file__)), CONTRACTS_JSON), 'rb') as fh:
+    CONTRACT_METADATA = _json_lib.loads(fh.read())
 
 PROXY_BALANCE_LIMIT = 10**8
 """int: proxy will stop serving requests if receiver balance is below PROXY_BALANCE_LIMIT"""
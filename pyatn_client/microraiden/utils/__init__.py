@@ -25,6 +25,7 @@ from .contract import (
     signed_transaction,
     signed_contract_transaction,
     signed_contract_transaction,
+    batch_call,
     get_logs,
     get_event_blocking,
     wait_for_transaction
@@ -64,6 +65,7 @@ __all__ = [
 
     signed_transaction,
     signed_contract_transaction,
+    batch_call,
     get_logs,
     get_event_blocking,
     wait_for_transaction,
@@ -1,15 +1,24 @@
 from typing import List, Any, Union, Dict
 
 import time
+import functools
+import requests
 from web3 import Web3
-from web3.contract import Contract
+from web3.contract import Contract, ContractFunction
+from web3.providers.rpc import HTTPProvider
+from web3.exceptions import BadFunctionCallOutput
+from eth_abi import decode_abi
+from eth_abi.exceptions import DecodingError
 from eth_account import Account
+from eth_utils import decode_hex
 
 from ..config import NETWORK_CFG
 from ..utils.populus_compat import LogFilter
 
 DEFAULT_TIMEOUT = 60
 DEFAULT_RETRY_INTERVAL = 3
+MIN_RETRY_INTERVAL = 0.25
+BACKOFF_FACTOR = 1.6
 
 
 def signed_transaction(
@@ -29,41 +38,122 @@ def signed_transaction(
     return account.signTransaction(tx)
 
 
+@functools.lru_cache(maxsize=64)
+def _contract_function(contract: Contract, func_sig: str):
+    """ABI lookup and function class of `func_sig` are built once per contract"""
+    return contract.get_function_by_signature(func_sig)
+
+
 def signed_contract_transaction(
     account: Account,
     contract: Contract,
     func_sig: str,
     args: List[Any],
-    value: int=0
+    value: int=0,
+    nonce: int=None,
+    gas_price: int=None
 ):
     web3 = contract.web3
-    tx_data = contract.get_function_by_signature(func_sig)(*args).buildTransaction({
+    if nonce is None:
+        nonce = web3.eth.getTransactionCount(account.address, 'pending')
+    if gas_price is None:
+        gas_price = web3.eth.gasPrice
+    tx_data = _contract_function(contract, func_sig)(*args).buildTransaction({
             'from': account.address,
-            'nonce': web3.eth.getTransactionCount(account.address),
-            'gasPrice': web3.eth.gasPrice,
+            'nonce': nonce,
+            'gasPrice': gas_price,
             'value': value
         })
     return account.signTransaction(tx_data)
 
 
-def get_logs(
-        contract: Contract,
-        event_name: str,
-        from_block: Union[int, str] = 0,
-        to_block: Union[int, str] = 'pending',
-        argument_filters: Dict[str, Any] = None
-):
+def batch_call(
+        web3: Web3,
+        functions: List[ContractFunction],
+        block_identifier: Union[int, str] = 'latest'
+) -> List[Any]:
+    """Call several contract functions in one JSON-RPC batch request.
+
+    Results are returned in the order of `functions`, a function with a single
+    output returns the value, otherwise a list of values like `.call()` does.
+    Providers other than `HTTPProvider` fall back to sequential calls.
+    Like `.call()`, a function without valid return data raises `BadFunctionCallOutput`.
+    """
+    provider = web3.providers[0]
+    if not isinstance(provider, HTTPProvider):
+        return [fn.call(block_identifier=block_identifier) for fn in functions]
+
+    payload = [
+        {
+            'jsonrpc': '2.0',
+            'id': i,
+            'method': 'eth_call',
+            'params': [
+                {'to': fn.address, 'data': fn._encode_transaction_data()},
+                block_identifier if isinstance(block_identifier, str) else hex(block_identifier)
+            ]
+        }
+        for i, fn in enumerate(functions)
+    ]
+    session = getattr(provider, 'session', None) or requests
+    request_kwargs = provider.get_request_kwargs()
+    request_kwargs.setdefault('timeout', 10)
+    resp = session.post(provider.endpoint_uri, json=payload, **request_kwargs)
+    resp.raise_for_status()
+    replies = resp.json()
+    if not isinstance(replies, list):
+        # nodes without batch support answer with a single error object
+        raise ValueError('JSON-RPC batch request is not supported by {}: {}'.format(provider.endpoint_uri, replies))
+    responses = {r['id']: r for r in replies}
+
+    results = []
+    for i, fn in enumerate(functions):
+        reply = responses.get(i)
+        if reply is None:
+            raise ValueError('JSON-RPC batch reply of {} has no response with id {}'.format(provider.endpoint_uri, i))
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+        output_types = [output['type'] for output in fn.abi['outputs']]
+        return_data = decode_hex(reply['result'])
+        if not return_data:
+            raise BadFunctionCallOutput(
+                'Could not transact with/call contract function {}, is contract '
+                'deployed correctly and chain synced?'.format(fn.fn_name)
+            )
+        try:
+            values = decode_abi(output_types, return_data)
+        except DecodingError as err:
+            raise BadFunctionCallOutput(
+                'Could not decode contract function call {} return data {} for '
+                'output_types {}'.format(fn.fn_name, return_data, output_types)
+            ) from err
+        results.append(values[0] if len(values) == 1 else list(values))
+    return results
+
+
+@functools.lru_cache(maxsize=64)
+def _event_abi(contract: Contract, event_name: str) -> Dict[str, Any]:
     event_abi = [
         abi_element for abi_element in contract.abi
         if abi_element['type'] == 'event' and abi_element['name'] == event_name
     ]
     assert len(event_abi) == 1, 'No event found matching name {}.'.format(event_name)
-    event_abi = event_abi[0]
+    return event_abi[0]
+
+
+def _event_filter(
+        contract: Contract,
+        event_name: str,
+        from_block: Union[int, str],
+        to_block: Union[int, str],
+        argument_filters: Dict[str, Any] = None
+) -> LogFilter:
+    event_abi = _event_abi(contract, event_name)
 
     if argument_filters is None:
         argument_filters = {}
 
-    tmp_filter = LogFilter(
+    return LogFilter(
         contract.web3,
         [event_abi],
         contract.address,
@@ -72,6 +162,16 @@ def get_logs(
         to_block,
         argument_filters
     )
+
+
+def get_logs(
+        contract: Contract,
+        event_name: str,
+        from_block: Union[int, str] = 0,
+        to_block: Union[int, str] = 'pending',
+        argument_filters: Dict[str, Any] = None
+):
+    tmp_filter = _event_filter(contract, event_name, from_block, to_block, argument_filters)
     logs = tmp_filter.get_logs()
     tmp_filter.uninstall()
     return logs
@@ -92,19 +192,22 @@ def get_event_blocking(
         wait=DEFAULT_RETRY_INTERVAL,
         timeout=DEFAULT_TIMEOUT
 ) -> Union[Dict[str, Any], None]:
-    for i in range(0, timeout + wait, wait):
-        logs = get_logs(
-            contract,
-            event_name,
-            from_block=from_block,
-            to_block=to_block,
-            argument_filters=argument_filters
-        )
-        matching_logs = [event for event in logs if not condition or condition(event)]
-        if matching_logs:
-            return matching_logs[0]
-        elif i < timeout:
-            _wait(wait)
+    # install the filter once, later polls only fetch the logs arrived since the last one
+    event_filter = _event_filter(contract, event_name, from_block, to_block, argument_filters)
+    try:
+        logs = event_filter.get_logs()
+        delays = _backoff(wait, timeout)
+        while True:
+            matching_logs = [event for event in logs if not condition or condition(event)]
+            if matching_logs:
+                return matching_logs[0]
+            delay = next(delays, None)
+            if delay is None:
+                break
+            _wait(delay)
+            logs = event_filter.get_changes()
+    finally:
+        event_filter.uninstall()
 
     return None
 
@@ -114,16 +217,33 @@ def _wait(duration: float):
     time.sleep(duration)
 
 
+def _backoff(max_interval: float, timeout: float):
+    """Yield the delays before each retry until `timeout` seconds passed.
+
+    Delays start at `MIN_RETRY_INTERVAL` and grow by `BACKOFF_FACTOR` up to `max_interval`.
+    """
+    deadline = time.monotonic() + timeout
+    delay = min(MIN_RETRY_INTERVAL, max_interval)
+    remaining = deadline - time.monotonic()
+    while remaining > 0:
+        yield min(delay, remaining)
+        delay = min(delay * BACKOFF_FACTOR, max_interval)
+        remaining = deadline - time.monotonic()
+
+
 def wait_for_transaction(
         web3: Web3,
         tx_hash: str,
         timeout: int = DEFAULT_TIMEOUT,
         polling_interval: int = DEFAULT_RETRY_INTERVAL
 ):
-    for waited in range(0, timeout + polling_interval, polling_interval):
+    delays = _backoff(polling_interval, timeout)
+    while True:
         tx_receipt = web3.eth.getTransactionReceipt(tx_hash)
         if tx_receipt is not None:
             return tx_receipt
-        if waited < timeout:
-            _wait(polling_interval)
+        delay = next(delays, None)
+        if delay is None:
+            break
+        _wait(delay)
     raise TimeoutError('Transaction {} was not mined.'.format(tx_hash))
@@ -5,12 +5,21 @@ from eth_utils import (
     encode_hex,
     decode_hex,
     remove_0x_prefix,
-    keccak,
     is_0x_prefixed,
     to_checksum_address
 )
 import rlp
 
+try:
+    # pycryptodome is installed with web3, hash with its C keccak directly
+    # instead of through the backend dispatch of eth_hash
+    from Crypto.Hash import keccak as _keccak
+
+    def keccak(primitive: bytes) -> bytes:
+        return _keccak.new(digest_bits=256, data=primitive).digest()
+except ImportError:
+    from eth_utils import keccak
+
 
 Type = str
 Name = str
@@ -148,16 +157,25 @@ def eth_sign_typed_data_eip(privkey: str, typed_data: List[TypedData]) -> bytes:
     return sign(privkey, msg, v=27)
 
 
+# schema hashes of the typed data signed for balance proofs and closing signatures, they never change
+_BALANCE_SCHEMA_HASH = keccak256('string message_id', 'address receiver', 'uint256 balance', 'address contract')
+_CLOSING_SCHEMA_HASH = keccak256('string message_id', 'address sender', 'uint256 balance', 'address contract')
+
+
 def get_balance_message(
         receiver: str, open_block_number: int, balance: int, contract_address: str
 ) -> bytes:
-    return eth_sign_typed_data_message([
-        ('string', 'message_id', 'Sender balance proof signature'),
-        ('address', 'receiver', receiver),
-        #  ('uint32', 'block_created', (open_block_number, 32)),
-        ('uint256', 'balance', (balance, 256)),
-        ('address', 'contract', contract_address)
-    ])
+    # same as eth_sign_typed_data_message of
+    #   ('string', 'message_id', 'Sender balance proof signature'),
+    #   ('address', 'receiver', receiver),
+    #   ('uint256', 'balance', (balance, 256)),
+    #   ('address', 'contract', contract_address)
+    # with the schema hash precomputed and the data packed directly
+    data = (b'Sender balance proof signature' +
+            decode_hex(receiver) +
+            balance.to_bytes(32, byteorder='big') +
+            decode_hex(contract_address))
+    return keccak(_BALANCE_SCHEMA_HASH + keccak(data))
 
 
 def sign_balance_proof(
@@ -184,13 +202,16 @@ def get_closing_message(
         balance: int,
         contract_address: str
 ) -> bytes:
-    return eth_sign_typed_data_message([
-        ('string', 'message_id', 'Receiver closing signature'),
-        ('address', 'sender', sender),
-        #  ('uint32', 'block_created', (open_block_number, 32)),
-        ('uint256', 'balance', (balance, 256)),
-        ('address', 'contract', contract_address)
-    ])
+    # same as get_balance_message, for
+    #   ('string', 'message_id', 'Receiver closing signature'),
+    #   ('address', 'sender', sender),
+    #   ('uint256', 'balance', (balance, 256)),
+    #   ('address', 'contract', contract_address)
+    data = (b'Receiver closing signature' +
+            decode_hex(sender) +
+            balance.to_bytes(32, byteorder='big') +
+            decode_hex(contract_address))
+    return keccak(_CLOSING_SCHEMA_HASH + keccak(data))
 
 
 def sign_close(
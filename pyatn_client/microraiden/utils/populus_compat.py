@@ -62,6 +62,10 @@ class LogFilter:
             formatted_logs.append(self.set_log_data(log))
         return formatted_logs
 
+    def get_changes(self):
+        logs = self.web3.eth.getFilterChanges(self.filter.filter_id)
+        return [self.set_log_data(dict(log)) for log in logs]
+
     def set_log_data(self, log):
         log['args'] = get_event_data(self.event_abi, log)['args']
         log['event'] = self.event_name
@@ -2,20 +2,19 @@
 # -*- coding: utf-8 -*-
 
 import os
-import re
 import json
 import click
 import importlib.util
 import logging
 import getpass
-import requests
 import time
-from web3 import Web3, HTTPProvider
-from web3.middleware import geth_poa_middleware
 
-from eth_account import Account
-
-from pyatn_client import Atn
+# web3, eth_account and Atn are imported by the commands using them,
+# so `pyatn --help` does not pay for importing them
+try:
+    import orjson as _json_lib
+except ImportError:
+    _json_lib = json
 
 def load_module(module_name, path):
     spec = importlib.util.spec_from_file_location(module_name, os.path.join(path, module_name + '.py'))
@@ -23,6 +22,33 @@ def load_module(module_name, path):
     spec.loader.exec_module(module)
     return module
 
+def _make_web3(http_provider='https://rpc-test.atnio.net'):
+    from web3 import Web3
+    from web3.middleware import geth_poa_middleware
+    from pyatn_client.utils import get_http_session, _SessionHTTPProvider
+
+    w3 = Web3(_SessionHTTPProvider(http_provider, get_http_session()))
+    w3.middleware_stack.inject(geth_poa_middleware, layer=0)
+    return w3
+
+def _handle_binary(response):
+    response_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'response_file')
+    with open(response_file, 'wb', buffering=1 << 20) as f:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            f.write(chunk)
+    click.echo('Save response file at {}'.format(response_file))
+
+def _handle_text(response):
+    click.echo(response.text)
+
+# Content-Type prefix -> handler of the DBot API response
+_CT_HANDLERS = (
+    # print JSON bodies as sent, not as a python dict repr
+    ('application/json', _handle_text),
+    ('audio', _handle_binary),
+    ('image', _handle_binary),
+)
+
 @click.group()
 def cli():
     pass
@@ -37,6 +63,8 @@ def create_account(output):
     """
     Create an encrypted account on ATN test net.
     """
+    from eth_account import Account
+
     acct = Account.create()
     password = getpass.getpass("Enter the password to encrypt your account: ")
     encrypted = Account.encrypt(acct.privateKey, password)
@@ -63,17 +91,23 @@ def get_atn(address):
     """
     Get ATN from the faucet server of ATN test net
     """
-    w3 = Web3(HTTPProvider('https://rpc-test.atnio.net'))
-    w3.middleware_stack.inject(geth_poa_middleware, layer=0)
-    click.echo('ATN Balance is: {} ATN'.format(w3.fromWei(w3.eth.getBalance(address), 'ether')))
-    resp = requests.post('http://119.3.57.66:4111/faucet/{}'.format(address))
+    from pyatn_client.utils import get_http_session
+
+    w3 = _make_web3()
+    before = w3.eth.getBalance(address)
+    click.echo('ATN Balance is: {} ATN'.format(w3.fromWei(before, 'ether')))
+    resp = get_http_session().post('http://119.3.57.66:4111/faucet/{}'.format(address), timeout=30)
     if resp.status_code == 200:
         click.echo('Get 100 ATN successfully. (One address can get 100 ATN everyday.)')
-        click.echo('Waiting 10 second for the transaction finished ...')
-        for i in range(10, 0, -1):
+        click.echo('Waiting for the transaction finished ...')
+        # stop as soon as the balance changes, at most 15 seconds
+        balance = before
+        for _ in range(15):
             time.sleep(1)
-            click.echo(i)
-        click.echo('ATN Balance is: {} ATN'.format(w3.fromWei(w3.eth.getBalance(address), 'ether')))
+            balance = w3.eth.getBalance(address)
+            if balance != before:
+                break
+        click.echo('ATN Balance is: {} ATN'.format(w3.fromWei(balance, 'ether')))
     else:
         click.echo('Can not get ATN. Try to visit out faucet page "https://faucet-test.atnio.net/"')
 
@@ -84,8 +118,7 @@ def get_atn(address):
     help='Address of the account to request ATN'
 )
 def get_balance(address):
-    w3 = Web3(HTTPProvider('https://rpc-test.atnio.net'))
-    w3.middleware_stack.inject(geth_poa_middleware, layer=0)
+    w3 = _make_web3()
     click.echo('ATN Balance is: {} ATN'.format(w3.fromWei(w3.eth.getBalance(address), 'ether')))
 
 @cli.command()
@@ -115,23 +148,39 @@ def get_balance(address):
     '--data',
     type=click.Path(exists=True, dir_okay=False, resolve_path=True),
     required=True,
-    help="Path to python file containing requests data for the DBot API"
+    help="Path to JSON file (or python file, see --data-format) containing requests data for the DBot API"
+)
+@click.option(
+    '--data-format',
+    type=click.Choice(['json', 'python']),
+    default=None,
+    help="Format of the data file, 'python' loads the `data` dict defined in a python file (deprecated). "
+         "Default is 'python' for .py files, otherwise 'json'"
 )
 def call(
         pk_file: str,
         pw_file: str,
         http_provider: str,
         dbot_address: str,
-        data: str
+        data: str,
+        data_format: str
 ):
     """
     Call an API of the DBot.
 
     """
+    from pyatn_client import Atn
 
-    requests_test = load_module(os.path.splitext(os.path.basename(data))[0],
-                                os.path.dirname(os.path.abspath(data)))
-    requests_data = requests_test.data
+    if data_format is None:
+        data_format = 'python' if data.endswith('.py') else 'json'
+    if data_format == 'json':
+        with open(data, 'rb') as fh:
+            requests_data = _json_lib.loads(fh.read())
+    else:
+        click.echo('Python data files are deprecated, use a JSON file instead.', err=True)
+        requests_test = load_module(os.path.splitext(os.path.basename(data))[0],
+                                    os.path.dirname(os.path.abspath(data)))
+        requests_data = requests_test.data
 
     atn = Atn(
         http_provider=http_provider,
@@ -140,25 +189,24 @@ def call(
     )
 
     #  channel = atn.get_suitable_channel(dbot_address, requests_data['endpoint']['uri'], requests_data['endpoint']['method'])
+    # stream the body, binary responses are written to file chunk by chunk
+    requests_kwargs = dict(requests_data['kwargs'])
+    requests_kwargs.setdefault('stream', True)
     response = atn.call_dbot_api(dbot_address,
                                  uri=requests_data['endpoint']['uri'],
                                  method=requests_data['endpoint']['method'],
-                                 **requests_data['kwargs'])
+                                 **requests_kwargs)
 
     if response.status_code == 200:
-        click.echo('Got 200 Response. Content-Type: {}'.format(response.headers['Content-Type']))
-        if re.match('^json/', response.headers['Content-Type']):
-            click.echo(response.headers)
-            click.echo(response.json)
-        elif response.headers['Content-Type'].startswith('audio') or response.headers['Content-Type'].startswith('image'):
-            click.echo(response.headers)
-            response_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'response_file')
-            with open(response_file, 'wb') as f:
-                f.write(response.content)
-            click.echo('Save response file at {}'.format(response_file))
+        ctype = response.headers['Content-Type']
+        click.echo('Got 200 Response. Content-Type: {}'.format(ctype))
+        click.echo(response.headers)
+        for prefix, handler in _CT_HANDLERS:
+            if ctype.startswith(prefix):
+                handler(response)
+                break
         else:
-            click.echo(response.headers)
-            click.echo(response.text)
+            _handle_text(response)
     else:
         click.echo('Got {} Response.'.format(response.status_code))
         click.echo(response.text)
@@ -191,6 +239,8 @@ def close(
     """
     Close the channel with a DBot.
     """
+    from pyatn_client import Atn
+
     atn = Atn(
         http_provider=http_provider,
         pk_file=pk_file,
@@ -1,13 +1,49 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import functools
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import HTTPProvider
+
+@functools.lru_cache(maxsize=256)
 def remove_slash_prefix(uri):
     if uri.startswith('/'):
         return uri[1:]
     else:
         return uri
 
+@functools.lru_cache(maxsize=256)
 def tobytes32(s):
-    length = len(s.encode('utf-8'))
-    assert(length <= 256)
-    return  s.encode('utf-8') + b'\0' * (32 - length)
+    b = s if isinstance(s, bytes) else s.encode('utf-8')
+    assert len(b) <= 32, 'string too long for bytes32'
+    return b.ljust(32, b'\0')
+
+
+@functools.lru_cache(maxsize=1)
+def get_http_session():
+    # keep-alive connections shared by the JSON-RPC and faucet requests of the CLI
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16,
+                          pool_maxsize=64,
+                          max_retries=Retry(total=3, backoff_factor=0.2))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class _SessionHTTPProvider(HTTPProvider):
+    """HTTPProvider which sends JSON-RPC requests through the given `requests.Session`"""
+    def __init__(self, endpoint_uri: str, session: requests.Session, request_kwargs=None) -> None:
+        super().__init__(endpoint_uri, request_kwargs)
+        self.session = session
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        request_kwargs = self.get_request_kwargs()
+        request_kwargs.setdefault('timeout', 10)
+        resp = self.session.post(self.endpoint_uri, data=request_data, **request_kwargs)
+        resp.raise_for_status()
+        return self.decode_rpc_response(resp.content)
@@ -24,6 +24,10 @@ setuptools.setup(
         'typing==3.6.6',
         'web3==4.7.2'
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'speedups': ['orjson']
+    },
     package_data={
         '': ['contracts.json', 'microraiden/contracts.json']
     },
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import threading
+import weakref
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from pyatn_client import atn as atn_module
+from pyatn_client.atn import Atn, AtnException, SYNC_RETRY_BASE_INTERVAL
+
+DBOTADDRESS = '0xfd4F504F373f0af5Ff36D9fbe1050E6300699230'
+PRICE_KEY = (DBOTADDRESS, '/reg', 'post')
+
+
+def _make_atn(request):
+    """Atn with the channel and price cached and the payment and HTTP request stubbed out"""
+    atn = object.__new__(Atn)
+    atn._dbot_locks = {}
+    atn._payment_lock = threading.Lock()
+    atn._aio_dbot_locks = weakref.WeakKeyDictionary()
+    atn._aio_session = None
+    atn._aio_loop = None
+    atn._channel_cache = {DBOTADDRESS: object()}
+    atn._price_cache = {PRICE_KEY: (10, float('inf'))}
+    atn._prepare_call = lambda dbot_address, uri, method: (None, 'http://dbot/call', {})
+    atn._request = request
+    return atn
+
+
+def _response(status_code):
+    resp = requests.Response()
+    resp.status_code = status_code
+    return resp
+
+
+def test_cache_kept_after_successful_call():
+    atn = _make_atn(lambda headers, method, url, **kwargs: _response(200))
+    assert atn.call_dbot_api(DBOTADDRESS, '/reg', 'POST').status_code == 200
+    assert DBOTADDRESS in atn._channel_cache
+    assert PRICE_KEY in atn._price_cache
+
+
+@pytest.mark.parametrize('status_code', [402, 500])
+def test_cache_dropped_after_failed_call(status_code):
+    atn = _make_atn(lambda headers, method, url, **kwargs: _response(status_code))
+    assert atn.call_dbot_api(DBOTADDRESS, '/reg', 'POST').status_code == status_code
+    assert DBOTADDRESS not in atn._channel_cache
+    assert PRICE_KEY not in atn._price_cache
+
+
+def test_cache_dropped_after_request_error():
+    def request(headers, method, url, **kwargs):
+        raise requests.ConnectionError('DBot server is down')
+
+    atn = _make_atn(request)
+    with pytest.raises(requests.ConnectionError):
+        atn.call_dbot_api(DBOTADDRESS, '/reg', 'POST')
+    assert DBOTADDRESS not in atn._channel_cache
+    assert PRICE_KEY not in atn._price_cache
+
+
+class _CallSession(object):
+    def __init__(self):
+        self.kwargs = None
+
+    def request(self, method, url, **kwargs):
+        self.kwargs = kwargs
+        return _response(200)
+
+
+def _make_call_atn():
+    """Atn sending the paid request with a stub session"""
+    atn = _make_atn(None)
+    del atn._request
+    atn._call_timeout = (3.0, 120.0)
+    atn._prepare_call = lambda dbot_address, uri, method: (None, 'http://dbot/call', {'X-Balance': '10'})
+    atn._session = _CallSession()
+    return atn
+
+
+def test_call_with_user_headers():
+    atn = _make_call_atn()
+    atn.call_dbot_api(DBOTADDRESS, '/reg', 'POST', headers={'Accept': 'application/json'})
+    assert atn._session.kwargs['headers'] == {'X-Balance': '10', 'Accept': 'application/json'}
+
+
+@pytest.mark.parametrize('requests_kwargs, timeout', [({}, (3.0, 120.0)), ({'timeout': 600}, 600)])
+def test_call_timeout(requests_kwargs, timeout):
+    atn = _make_call_atn()
+    atn.call_dbot_api(DBOTADDRESS, '/reg', 'POST', **requests_kwargs)
+    assert atn._session.kwargs['timeout'] == timeout
+
+
+class _AioResponse(object):
+    def __init__(self, status):
+        self.status = status
+
+    async def read(self):
+        pass
+
+    def release(self):
+        pass
+
+
+class _AioSession(object):
+    """aiohttp session stub recording the requests sent"""
+    def __init__(self, events, status=200):
+        self._events = events
+        self._status = status
+
+    async def request(self, method, url, **kwargs):
+        self._events.append(('send', kwargs['headers']['n']))
+        await asyncio.sleep(0.01)
+        return _AioResponse(self._status)
+
+
+def _make_aio_atn(events, status=200, prepare=None):
+    counter = iter(range(1000))
+
+    def prepare_call(dbot_address, uri, method):
+        n = next(counter)
+        events.append(('pay', n))
+        if prepare is not None:
+            prepare()
+        return None, 'http://dbot/call', {'n': n}
+
+    atn = _make_atn(None)
+    atn._prepare_call = prepare_call
+    session = _AioSession(events, status)
+    atn._get_aio_session = lambda: session
+    return atn
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_async_calls_to_same_dbot_paid_and_sent_in_order():
+    events = []
+    atn = _make_aio_atn(events)
+
+    async def main():
+        return await asyncio.gather(*[atn.call_dbot_api_async(DBOTADDRESS, '/reg', 'POST') for _ in range(3)])
+
+    assert [resp.status for resp in _run(main())] == [200] * 3
+    assert events == [('pay', 0), ('send', 0), ('pay', 1), ('send', 1), ('pay', 2), ('send', 2)]
+    assert not atn._dbot_lock(DBOTADDRESS).locked()
+    assert PRICE_KEY in atn._price_cache
+
+
+def test_async_cache_dropped_after_failed_call():
+    atn = _make_aio_atn([], status=402)
+    assert _run(atn.call_dbot_api_async(DBOTADDRESS, '/reg', 'POST')).status == 402
+    assert DBOTADDRESS not in atn._channel_cache
+    assert PRICE_KEY not in atn._price_cache
+    assert not atn._dbot_lock(DBOTADDRESS).locked()
+
+
+def test_async_call_cancelled_while_paying():
+    paying, paid = threading.Event(), threading.Event()
+
+    def prepare():
+        paying.set()
+        paid.wait(5)
+
+    events = []
+    atn = _make_aio_atn(events, prepare=prepare)
+    lock = atn._dbot_lock(DBOTADDRESS)
+
+    async def main():
+        loop = asyncio.get_event_loop()
+        task = loop.create_task(atn.call_dbot_api_async(DBOTADDRESS, '/reg', 'POST'))
+        await loop.run_in_executor(None, paying.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # the payment is still being prepared, the lock is held until it's done
+        assert lock.locked()
+        paid.set()
+        await loop.run_in_executor(None, lock.acquire)
+        lock.release()
+
+    _run(main())
+    assert events == [('pay', 0)]
+    assert DBOTADDRESS not in atn._channel_cache
+    assert PRICE_KEY not in atn._price_cache
+
+
+def test_release_prepared_with_cancelled_future():
+    atn = _make_atn(None)
+    lock = atn._dbot_lock(DBOTADDRESS)
+    loop = asyncio.new_event_loop()
+    try:
+        prepared = loop.create_future()
+        prepared.cancel()
+        atn._release_prepared(lock, DBOTADDRESS, '/reg', 'POST', prepared)
+    finally:
+        loop.close()
+    assert not lock.locked()
+    assert DBOTADDRESS not in atn._channel_cache
+
+
+def test_async_locks_per_event_loop():
+    atn = _make_aio_atn([])
+    loops = [asyncio.new_event_loop() for _ in range(2)]
+    try:
+        for loop in loops:
+            assert loop.run_until_complete(atn.call_dbot_api_async(DBOTADDRESS, '/reg', 'POST')).status == 200
+        locks = [atn._aio_dbot_locks[loop][DBOTADDRESS] for loop in loops]
+        assert locks[0] is not locks[1]
+    finally:
+        for loop in loops:
+            loop.close()
+
+
+def test_close_closes_aio_session():
+    pytest.importorskip('aiohttp')
+    atn = _make_atn(None)
+    atn._session = requests.Session()
+    atn._call_timeout = (3.0, 120.0)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        async def open_session():
+            return atn._get_aio_session()
+
+        session = loop.run_until_complete(open_session())
+        atn.close()
+        assert session.closed
+        assert atn._aio_session is None
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+class _Clock(object):
+    """stands in for the `time` module of `pyatn_client.atn`, `sleep` only moves the clock"""
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(atn_module, 'time', clock)
+    monkeypatch.setattr(atn_module, 'random', SimpleNamespace(uniform=lambda a, b: 0))
+    return clock
+
+
+def _make_sync_atn(dbot_channels, deposit=100):
+    """Atn polling `dbot_channels` from the DBot server, the last one is repeated"""
+    polls = []
+
+    def request_dbot_channel(url):
+        polls.append(url)
+        return dbot_channels[min(len(polls), len(dbot_channels)) - 1]
+
+    atn = _make_atn(None)
+    atn.get_dbot_url = lambda dbot_address: 'http://dbot'
+    atn._request_dbot_channel = request_dbot_channel
+    balances = []
+    channel = SimpleNamespace(receiver=DBOTADDRESS, sender='0xsender', block=7, deposit=deposit,
+                              update_balance=balances.append)
+    return atn, channel, polls, balances
+
+
+def test_wait_dbot_sync_synced_at_first_poll(clock):
+    atn, channel, polls, balances = _make_sync_atn([{'deposit': '100', 'balance': '30'}])
+    atn.wait_dbot_sync(DBOTADDRESS, channel=channel)
+    assert polls == ['http://dbot/api/v1/dbots/{}/channels/0xsender/7'.format(DBOTADDRESS)]
+    assert clock.sleeps == []
+    assert balances == [30]
+
+
+def test_wait_dbot_sync_backoff_until_deposit_matches(clock):
+    atn, channel, polls, balances = _make_sync_atn([
+        None,
+        {'deposit': '50', 'balance': '0'},
+        {'deposit': '50', 'balance': '0'},
+        {'deposit': '100', 'balance': '10'},
+    ])
+    atn.wait_dbot_sync(DBOTADDRESS, channel=channel)
+    base = SYNC_RETRY_BASE_INTERVAL
+    assert clock.sleeps == [base, base * 2, base * 4]
+    assert len(polls) == 4
+    assert balances == [10]
+
+
+def test_wait_dbot_sync_expected_deposit(clock):
+    # the DBot server still sees the deposit before the topup
+    atn, channel, polls, balances = _make_sync_atn([
+        {'deposit': '100', 'balance': '0'},
+        {'deposit': '150', 'balance': '0'},
+    ])
+    atn.wait_dbot_sync(DBOTADDRESS, deposit=150, channel=channel)
+    assert len(polls) == 2
+    assert balances == [0]
+
+
+def test_wait_dbot_sync_gives_up_at_deadline(clock):
+    atn, channel, polls, balances = _make_sync_atn([{'deposit': '50', 'balance': '0'}])
+    start = clock.now
+    with pytest.raises(AtnException):
+        atn.wait_dbot_sync(DBOTADDRESS, retry_interval=1, retry_times=3, channel=channel)
+    # delays double up to retry_interval, the last one is cut at the deadline
+    assert max(clock.sleeps) == 1
+    base = SYNC_RETRY_BASE_INTERVAL
+    assert clock.sleeps[:3] == [base, base * 2, base * 4]
+    assert clock.now - start == pytest.approx(3)
+    assert len(polls) == len(clock.sleeps) + 1
+    assert balances == []
+
+
+class _ChannelResponse(object):
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+
+class _ChannelSession(object):
+    """requests.Session stub answering the channel polls with `responses` in order"""
+    def __init__(self, responses):
+        self._responses = iter(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.sent_headers.append(headers)
+        return next(self._responses)
+
+
+def _make_channel_atn(responses):
+    atn = _make_atn(None)
+    atn._channel_etag = {}
+    atn._http_timeout = (3.0, 10.0)
+    atn._session = _ChannelSession(responses)
+    return atn
+
+
+CHANNEL_URL = 'http://dbot/api/v1/dbots/{}/channels/0xsender/7'.format(DBOTADDRESS)
+CHANNEL_BODY = b'{"deposit": "100", "balance": "30"}'
+
+
+def test_request_dbot_channel_revalidated_with_etag():
+    atn = _make_channel_atn([
+        _ChannelResponse(200, CHANNEL_BODY, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Oct 2018 00:00:00 GMT'}),
+        _ChannelResponse(304),
+    ])
+    assert atn._request_dbot_channel(CHANNEL_URL) == {'deposit': '100', 'balance': '30'}
+    assert atn._request_dbot_channel(CHANNEL_URL) == {'deposit': '100', 'balance': '30'}
+    assert atn._session.sent_headers == [
+        None,
+        {'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Oct 2018 00:00:00 GMT'},
+    ]
+
+
+def test_request_dbot_channel_changed_after_etag():
+    atn = _make_channel_atn([
+        _ChannelResponse(200, CHANNEL_BODY, {'ETag': '"v1"'}),
+        _ChannelResponse(200, b'{"deposit": "150", "balance": "30"}', {'ETag': '"v2"'}),
+        _ChannelResponse(304),
+    ])
+    atn._request_dbot_channel(CHANNEL_URL)
+    assert atn._request_dbot_channel(CHANNEL_URL)['deposit'] == '150'
+    assert atn._request_dbot_channel(CHANNEL_URL)['deposit'] == '150'
+    assert atn._session.sent_headers[2] == {'If-None-Match': '"v2"'}
+
+
+def test_request_dbot_channel_without_validators():
+    atn = _make_channel_atn([_ChannelResponse(200, CHANNEL_BODY), _ChannelResponse(404)])
+    assert atn._request_dbot_channel(CHANNEL_URL)['balance'] == '30'
+    assert atn._request_dbot_channel(CHANNEL_URL) is None
+    assert atn._session.sent_headers == [None, None]
+    assert atn._channel_etag == {}
+
+
+@pytest.mark.parametrize('domain, url', [
+    ('dbot.atnio.net', 'http://dbot.atnio.net'),
+    ('http://dbot.atnio.net', 'http://dbot.atnio.net'),
+    ('https://dbot.atnio.net:8443', 'https://dbot.atnio.net:8443'),
+    ('HTTPS://dbot.atnio.net', 'HTTPS://dbot.atnio.net'),
+    ('httpbin.org', 'http://httpbin.org'),
+    ('https-dbot.atnio.net', 'http://https-dbot.atnio.net'),
+])
+def test_normalize_url(domain, url):
+    assert atn_module._normalize_url(domain) == url
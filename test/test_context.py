@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from pyatn_client.microraiden.client import context as context_module
+from pyatn_client.microraiden.client.context import Context, GAS_PRICE_TTL
+
+ADDRESS = '0x0cc1f6e1A55b163301434A47B1cB68CBD7e27CAD'
+
+
+class _Eth(object):
+    """web3.eth stub counting the node reads"""
+    def __init__(self, nonce=5, gas_price=1000):
+        self.nonce = nonce
+        self.gas_price = gas_price
+        self.nonce_reads = 0
+        self.gas_price_reads = 0
+        self.send_error = None
+        self.sent = []
+
+    @property
+    def gasPrice(self):
+        self.gas_price_reads += 1
+        return self.gas_price
+
+    def getTransactionCount(self, address, block_identifier):
+        assert (address, block_identifier) == (ADDRESS, 'pending')
+        self.nonce_reads += 1
+        return self.nonce
+
+    def sendRawTransaction(self, raw_transaction):
+        if self.send_error is not None:
+            raise self.send_error
+        self.sent.append(raw_transaction)
+        return b'tx hash'
+
+
+@pytest.fixture
+def context(monkeypatch):
+    def signed_contract_transaction(account, contract, func_sig, args, value, nonce, gas_price):
+        return SimpleNamespace(rawTransaction=(nonce, gas_price))
+
+    monkeypatch.setattr(context_module, 'signed_contract_transaction', signed_contract_transaction)
+    ctx = object.__new__(Context)
+    ctx.web3 = SimpleNamespace(eth=_Eth())
+    ctx.account = SimpleNamespace(address=ADDRESS)
+    ctx.tx_lock = threading.Lock()
+    ctx._gas_price = None
+    ctx._nonce = None
+    return ctx
+
+
+def _send(ctx):
+    return ctx.send_contract_transaction(None, 'createChannel(address,uint192)', [], 0)
+
+
+def test_nonce_counted_locally_after_successful_send(context):
+    for _ in range(3):
+        assert _send(context) == b'tx hash'
+    eth = context.web3.eth
+    assert [nonce for nonce, _ in eth.sent] == [5, 6, 7]
+    assert eth.nonce_reads == 1
+
+
+def test_nonce_read_again_after_failed_send(context):
+    eth = context.web3.eth
+    _send(context)
+    eth.send_error = ValueError('nonce too low')
+    with pytest.raises(ValueError):
+        _send(context)
+    assert context._nonce is None
+
+    # the account sent transactions elsewhere meanwhile
+    eth.send_error = None
+    eth.nonce = 9
+    _send(context)
+    assert [nonce for nonce, _ in eth.sent] == [5, 9]
+    assert eth.nonce_reads == 2
+
+
+def test_gas_price_read_again_after_ttl(context, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(context_module.time, 'monotonic', lambda: now[0])
+    eth = context.web3.eth
+    assert context.tx_params()['gas_price'] == 1000
+
+    eth.gas_price = 2000
+    now[0] += GAS_PRICE_TTL - 1
+    assert context.tx_params()['gas_price'] == 1000
+    assert eth.gas_price_reads == 1
+
+    now[0] += 1
+    assert context.tx_params()['gas_price'] == 2000
+    assert eth.gas_price_reads == 2
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+from eth_abi import encode_abi
+from eth_utils import encode_hex
+from web3 import Web3
+from web3.exceptions import BadFunctionCallOutput
+
+from pyatn_client.microraiden.utils import batch_call
+from pyatn_client.microraiden.utils import contract as contract_module
+from pyatn_client.microraiden.utils.contract import BACKOFF_FACTOR, MIN_RETRY_INTERVAL, _backoff
+from pyatn_client.utils import _SessionHTTPProvider
+
+ENDPOINT = 'http://node:8545'
+CONTRACT_ADDRESS = '0x0D0584549ae3eE0EB4E52bE4d4A0bf8d00B5dE3c'
+ABI = [
+    {'type': 'function', 'name': 'price', 'constant': True, 'inputs': [],
+     'outputs': [{'name': '', 'type': 'uint256'}], 'payable': False, 'stateMutability': 'view'},
+    {'type': 'function', 'name': 'endpoint', 'constant': True, 'inputs': [],
+     'outputs': [{'name': '', 'type': 'bytes32'}, {'name': '', 'type': 'uint256'}],
+     'payable': False, 'stateMutability': 'view'},
+]
+
+
+class _Response(object):
+    def __init__(self, replies):
+        self._replies = replies
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._replies
+
+
+class _Session(object):
+    """requests.Session stub answering a JSON-RPC batch with `reply(payload)`"""
+    def __init__(self, reply):
+        self._reply = reply
+        self.kwargs = None
+
+    def post(self, url, json, **kwargs):
+        assert url == ENDPOINT
+        self.kwargs = kwargs
+        return _Response(self._reply(json))
+
+
+def _functions(reply):
+    session = _Session(reply)
+    w3 = Web3(_SessionHTTPProvider(ENDPOINT, session))
+    contract = w3.eth.contract(address=CONTRACT_ADDRESS, abi=ABI)
+    return w3, [contract.functions.price(), contract.functions.endpoint()], session
+
+
+def _result(*types_and_values):
+    types, values = zip(*types_and_values)
+    return encode_hex(encode_abi(list(types), list(values)))
+
+
+RESULTS = [
+    _result(('uint256', 10 ** 18)),
+    _result(('bytes32', b'reg'.ljust(32, b'\0')), ('uint256', 7)),
+]
+
+
+def test_replies_out_of_order():
+    def reply(payload):
+        return [{'jsonrpc': '2.0', 'id': r['id'], 'result': RESULTS[r['id']]} for r in reversed(payload)]
+
+    w3, functions, session = _functions(reply)
+    assert batch_call(w3, functions) == [10 ** 18, [b'reg'.ljust(32, b'\0'), 7]]
+    assert session.kwargs['timeout'] == 10
+
+
+def test_reply_with_error():
+    def reply(payload):
+        return [
+            {'jsonrpc': '2.0', 'id': 0, 'result': RESULTS[0]},
+            {'jsonrpc': '2.0', 'id': 1, 'error': {'code': -32000, 'message': 'execution reverted'}},
+        ]
+
+    w3, functions, _ = _functions(reply)
+    with pytest.raises(ValueError, match='execution reverted'):
+        batch_call(w3, functions)
+
+
+def test_empty_result():
+    def reply(payload):
+        return [{'jsonrpc': '2.0', 'id': r['id'], 'result': '0x'} for r in payload]
+
+    w3, functions, _ = _functions(reply)
+    with pytest.raises(BadFunctionCallOutput):
+        batch_call(w3, functions)
+
+
+def test_reply_not_a_list():
+    def reply(payload):
+        return {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'batch not supported'}}
+
+    w3, functions, _ = _functions(reply)
+    with pytest.raises(ValueError, match='not supported by {}'.format(ENDPOINT)):
+        batch_call(w3, functions)
+
+
+def test_reply_missing_id():
+    def reply(payload):
+        return [{'jsonrpc': '2.0', 'id': 0, 'result': RESULTS[0]}]
+
+    w3, functions, _ = _functions(reply)
+    with pytest.raises(ValueError, match='{} has no response with id 1'.format(ENDPOINT)):
+        batch_call(w3, functions)
+
+
+class _Clock(object):
+    """stands in for the `time` module of the contract helpers, `sleep` only moves the clock"""
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(contract_module, 'time', clock)
+    return clock
+
+
+def test_backoff_grows_to_max_interval_until_timeout(clock):
+    delays = []
+    for delay in _backoff(1, 5):
+        delays.append(delay)
+        clock.sleep(delay)
+    assert delays[:3] == [MIN_RETRY_INTERVAL, MIN_RETRY_INTERVAL * BACKOFF_FACTOR,
+                          MIN_RETRY_INTERVAL * BACKOFF_FACTOR ** 2]
+    assert max(delays) == 1
+    assert sum(delays) == pytest.approx(5)
+
+
+def test_backoff_max_interval_below_min_retry_interval(clock):
+    delays = _backoff(0.1, 1)
+    assert [next(delays) for _ in range(3)] == [0.1, 0.1, 0.1]
+
+
+class _LogFilter(object):
+    """installed log filter stub, `changes` are returned by the polls after the first read"""
+    def __init__(self, logs, changes):
+        self._logs = logs
+        self._changes = iter(changes)
+        self.polls = 0
+        self.uninstalled = False
+
+    def get_logs(self):
+        return self._logs
+
+    def get_changes(self):
+        self.polls += 1
+        return next(self._changes, [])
+
+    def uninstall(self):
+        self.uninstalled = True
+
+
+@pytest.fixture
+def log_filter(monkeypatch):
+    holder = {}
+
+    def event_filter(contract, event_name, from_block, to_block, argument_filters):
+        holder['args'] = (event_name, from_block, to_block, argument_filters)
+        return holder['filter']
+
+    monkeypatch.setattr(contract_module, '_event_filter', event_filter)
+    return holder
+
+
+def test_get_event_blocking_found_in_existing_logs(clock, log_filter):
+    log_filter['filter'] = _LogFilter([{'args': {'n': 1}}], [])
+    event = contract_module.get_event_blocking(None, 'ChannelCreated', from_block=3,
+                                               argument_filters={'_sender_address': '0xsender'})
+    assert event == {'args': {'n': 1}}
+    assert log_filter['args'] == ('ChannelCreated', 3, 'latest', {'_sender_address': '0xsender'})
+    assert log_filter['filter'].polls == 0
+    assert log_filter['filter'].uninstalled
+
+
+def test_get_event_blocking_polls_changes_until_condition(clock, log_filter):
+    log_filter['filter'] = _LogFilter([{'args': {'n': 1}}], [[], [{'args': {'n': 2}}], [{'args': {'n': 3}}]])
+    event = contract_module.get_event_blocking(None, 'ChannelToppedUp', condition=lambda e: e['args']['n'] == 3)
+    assert event == {'args': {'n': 3}}
+    assert log_filter['filter'].polls == 3
+    assert clock.sleeps == [MIN_RETRY_INTERVAL, MIN_RETRY_INTERVAL * BACKOFF_FACTOR,
+                            MIN_RETRY_INTERVAL * BACKOFF_FACTOR ** 2]
+    assert log_filter['filter'].uninstalled
+
+
+def test_get_event_blocking_timeout(clock, log_filter):
+    log_filter['filter'] = _LogFilter([], [])
+    assert contract_module.get_event_blocking(None, 'ChannelSettled', wait=1, timeout=4) is None
+    assert sum(clock.sleeps) == pytest.approx(4)
+    assert log_filter['filter'].polls == len(clock.sleeps)
+    assert log_filter['filter'].uninstalled
+
+
+def test_get_event_blocking_uninstalls_filter_on_error(clock, log_filter):
+    log_filter['filter'] = _LogFilter([{}], [])
+
+    def condition(event):
+        raise KeyError('args')
+
+    with pytest.raises(KeyError):
+        contract_module.get_event_blocking(None, 'ChannelSettled', condition=condition)
+    assert log_filter['filter'].uninstalled
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pyatn_client.microraiden.utils.crypto import (
+    eth_sign_typed_data_message,
+    get_balance_message,
+    get_closing_message,
+)
+
+SENDER = '0x0cc1f6e1A55b163301434A47B1cB68CBD7e27CAD'
+RECEIVER = '0xfd4F504F373f0af5Ff36D9fbe1050E6300699230'
+CONTRACT_ADDRESS = '0x0D0584549Ae3EE0eB4e52bE4D4a0bf8D00b5dE3c'
+BALANCES = [0, 1, 10 ** 18, 2 ** 256 - 1]
+
+
+@pytest.mark.parametrize('balance', BALANCES)
+def test_balance_message_same_as_typed_data(balance):
+    assert get_balance_message(RECEIVER, 1234, balance, CONTRACT_ADDRESS) == eth_sign_typed_data_message([
+        ('string', 'message_id', 'Sender balance proof signature'),
+        ('address', 'receiver', RECEIVER),
+        ('uint256', 'balance', (balance, 256)),
+        ('address', 'contract', CONTRACT_ADDRESS),
+    ])
+
+
+@pytest.mark.parametrize('balance', BALANCES)
+def test_closing_message_same_as_typed_data(balance):
+    assert get_closing_message(SENDER, 1234, balance, CONTRACT_ADDRESS) == eth_sign_typed_data_message([
+        ('string', 'message_id', 'Receiver closing signature'),
+        ('address', 'sender', SENDER),
+        ('uint256', 'balance', (balance, 256)),
+        ('address', 'contract', CONTRACT_ADDRESS),
+    ])
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import logging
+
+from pyatn_client import log
+
+
+def _record(msg):
+    return logging.makeLogRecord({'name': 'atn', 'levelno': logging.INFO, 'levelname': 'INFO', 'msg': msg})
+
+
+def test_records_kept_when_file_configured_again(tmp_path):
+    filename = str(tmp_path / 'atn.log')
+    old = log.queued_file_handler(filename, encoding='utf8')
+    old.handle(_record('before'))
+    new = log.queued_file_handler(filename, encoding='utf8')
+    # still attached to the loggers until dictConfig swaps the handlers
+    old.handle(_record('while reconfiguring'))
+    new.handle(_record('after'))
+    log._LISTENERS.pop(filename).stop()
+
+    with open(filename, encoding='utf8') as f:
+        assert f.read().splitlines() == ['before', 'while reconfiguring', 'after']
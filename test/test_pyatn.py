@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+
+import pytest
+from click.testing import CliRunner
+
+import pyatn_client
+from pyatn_client.pyatn import cli
+
+DBOTADDRESS = '0xfd4F504F373f0af5Ff36D9fbe1050E6300699230'
+REQUESTS_DATA = {
+    'endpoint': {'uri': '/reg', 'method': 'POST'},
+    'kwargs': {'data': {'theme': '中秋月更圆'}},
+}
+
+
+class _Response(object):
+    status_code = 200
+    headers = {'Content-Type': 'application/json'}
+    text = '{"poem": "..."}'
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    class FakeAtn(object):
+        def __init__(self, **kwargs):
+            pass
+
+        def call_dbot_api(self, dbot_address, uri, method, **requests_kwargs):
+            calls.append((dbot_address, uri, method, requests_kwargs))
+            return _Response()
+
+    monkeypatch.setattr(pyatn_client, 'Atn', FakeAtn, raising=False)
+    return calls
+
+
+def _call(tmp_path, data_file, *args):
+    (tmp_path / 'privatekey').write_text('{}')
+    (tmp_path / 'password').write_text('')
+    return CliRunner(mix_stderr=False).invoke(cli, [
+        'call',
+        '--pk-file', str(tmp_path / 'privatekey'),
+        '--pw-file', str(tmp_path / 'password'),
+        '--dbot-address', DBOTADDRESS,
+        '--data', str(data_file),
+    ] + list(args))
+
+
+def _expected_call():
+    return (DBOTADDRESS, '/reg', 'POST', {'data': {'theme': '中秋月更圆'}, 'stream': True})
+
+
+@pytest.mark.parametrize('name', ['data.json', 'data.txt'])
+def test_call_json_data_file(tmp_path, calls, name):
+    data_file = tmp_path / name
+    data_file.write_text(json.dumps(REQUESTS_DATA), encoding='utf-8')
+    result = _call(tmp_path, data_file)
+    assert result.exit_code == 0, result.output
+    assert calls == [_expected_call()]
+    assert not result.stderr_bytes
+    assert '{"poem": "..."}' in result.stdout
+
+
+def test_call_python_data_file(tmp_path, calls):
+    data_file = tmp_path / 'requests_data.py'
+    data_file.write_text('data = {!r}\n'.format(REQUESTS_DATA), encoding='utf-8')
+    result = _call(tmp_path, data_file)
+    assert result.exit_code == 0, result.output
+    assert calls == [_expected_call()]
+    assert 'Python data files are deprecated' in result.stderr
+
+
+def test_call_data_format_overrides_suffix(tmp_path, calls):
+    data_file = tmp_path / 'requests_data.py'
+    data_file.write_text(json.dumps(REQUESTS_DATA), encoding='utf-8')
+    result = _call(tmp_path, data_file, '--data-format', 'json')
+    assert result.exit_code == 0, result.output
+    assert calls == [_expected_call()]
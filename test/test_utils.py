@@ -0,0 +1,28 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from pyatn_client.utils import remove_slash_prefix, tobytes32
+
+
+@pytest.mark.parametrize('s, b', [
+    ('', b'\0' * 32),
+    ('post', b'post' + b'\0' * 28),
+    (b'/reg', b'/reg' + b'\0' * 28),
+    ('月', '月'.encode('utf-8') + b'\0' * 29),
+    ('x' * 32, b'x' * 32),
+])
+def test_tobytes32(s, b):
+    assert tobytes32(s) == b
+
+
+@pytest.mark.parametrize('s', ['x' * 33, b'x' * 33, '月' * 11])
+def test_tobytes32_too_long(s):
+    with pytest.raises(AssertionError):
+        tobytes32(s)
+
+
+def test_remove_slash_prefix():
+    assert remove_slash_prefix('/reg') == 'reg'
+    assert remove_slash_prefix('reg') == 'reg'